@@ -0,0 +1 @@
+"""Пакет бенчмарков тестовой инфраструктуры"""
@@ -0,0 +1,190 @@
+"""Модуль бенчмарков тестовой инфраструктуры с проверкой регрессий относительно базовой линии.
+
+Все замеры идут против локального сервера воспроизведения кассеты (по умолчанию - детерминированной
+синтетической из benchmarks.standin), сеть не используется. Запуск из корня репозитория:
+
+    python -m benchmarks.run                      # сравнить с benchmarks/baseline.json
+    python -m benchmarks.run --update-baseline    # сохранить текущие замеры как базовую линию
+    python -m benchmarks.run --require-baseline   # в CI: без базовой линии - ошибка, а не пропуск сравнения
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from harness import http_client
+from harness.cassette import Cassette, ReplayServer
+from harness.http_client import ApiClient
+from benchmarks.standin import RANDOM_BREWERY_ID, build_cassette
+
+MODULES = ('test_addopt_func.py', 'test_brewery_api.py', 'test_dog_api.py', 'test_jsonplaceholder_api.py')
+DEFAULT_BASELINE = Path(__file__).with_name('baseline.json')
+DEFAULT_THRESHOLD = 0.2
+DEFAULT_REPEAT = 3
+HELPER_ITERATIONS = 20
+# отклонения меньше этих значений считаются шумом и не проверяются порогом
+MIN_DELTAS = {'wall': 0.005, 'peak_kb': 512, 'requests': 0}
+
+
+def run_pytest(args: list, cassette_path: str) -> dict:
+    """Функция запуска pytest в отдельном процессе: время, кол-во запросов и пиковая память (RSS, Кб)"""
+    with tempfile.TemporaryDirectory() as tmp:
+        report_path = os.path.join(tmp, 'latency.json')
+        command = [sys.executable, '-m', 'pytest', '-q', '-p', 'no:cacheprovider', f'--replay={cassette_path}',
+                   f'--latency-report={report_path}', '--latency-top=0', *args]
+        started = time.perf_counter()
+        process = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        _, status, usage = os.wait4(process.pid, 0)
+        wall = time.perf_counter() - started
+        process.returncode = os.waitstatus_to_exitcode(status)
+        if process.returncode != 0:
+            raise RuntimeError(f'pytest {" ".join(args)} завершился с кодом {process.returncode}')
+        with open(report_path, encoding='utf-8') as file:
+            requests_sent = len(json.load(file)['requests'])
+    return {'wall': wall, 'requests': requests_sent, 'peak_kb': usage.ru_maxrss}
+
+
+def bench_pytest(cassette_path: str, repeat: int) -> dict:
+    """Функция замеров сбора тестов и прогона каждого модуля (лучший результат из repeat запусков)"""
+    runs = {'collect': ['--collect-only'], **{f'module:{module}': [module] for module in MODULES}}
+    results = {}
+    for name, args in runs.items():
+        samples = [run_pytest(args, cassette_path) for _ in range(repeat)]
+        results[name] = {'wall': min(sample['wall'] for sample in samples),
+                         'requests': samples[-1]['requests'],
+                         'peak_kb': min(sample['peak_kb'] for sample in samples)}
+    return results
+
+
+def _helper_cases() -> dict:
+    """Функция сбора замеряемых вызовов: функции-хелперы, разбор JSON и проверка моделей"""
+    import test_brewery_api
+    import test_dog_api
+    import test_jsonplaceholder_api
+    from harness.schema import validate_list
+
+    brewery = test_brewery_api.get_brewery_by_id(RANDOM_BREWERY_ID).content
+    breweries = test_brewery_api.get_n_breweries_on_page('200')
+    post = test_jsonplaceholder_api.get_posts(1).content
+    posts = test_jsonplaceholder_api.get_posts()
+    hound_images = test_dog_api.send_request_all_breed_imgs('hound').content
+    new_post = test_jsonplaceholder_api.Post(title='some title', body='some body', userId=1).model_dump_json()
+
+    return {
+        'helper:send_request_no_params': (test_dog_api.send_request_no_params, (test_dog_api.LIST_ALL_BREEDS,)),
+        'helper:send_request_all_breed_imgs[hound]': (test_dog_api.send_request_all_breed_imgs, ('hound',)),
+        'helper:send_request_rand_breed_imgs': (test_dog_api.send_request_rand_breed_imgs, ('hound',)),
+        'helper:get_brewery_by_id': (test_brewery_api.get_brewery_by_id, (RANDOM_BREWERY_ID,)),
+        'helper:get_brewery_by_type': (test_brewery_api.get_brewery_by_type, ('micro',)),
+        'helper:get_n_breweries_on_page[200]': (test_brewery_api.get_n_breweries_on_page, ('200',)),
+        'helper:iter_breweries[nano]': (lambda: sum(1 for _ in test_brewery_api.iter_breweries('nano')), ()),
+        'helper:get_posts': (test_jsonplaceholder_api.get_posts, ()),
+        'helper:get_posts[1]': (test_jsonplaceholder_api.get_posts, (1,)),
+        'helper:create_post': (test_jsonplaceholder_api.create_post, (new_post,)),
+        'parse:json.loads[hound images]': (json.loads, (hound_images,)),
+        'parse:Brewery.model_validate_json': (test_brewery_api.Brewery.model_validate_json, (brewery,)),
+        'parse:validate_list[Brewery x200]': (validate_list, (breweries, test_brewery_api.Brewery)),
+        'parse:Post.model_validate_json': (test_jsonplaceholder_api.Post.model_validate_json, (post,)),
+        'parse:validate_list[Post x100]': (validate_list, (posts, test_jsonplaceholder_api.Post)),
+    }
+
+
+def bench_helpers(cassette: Cassette, repeat: int) -> dict:
+    """Функция замеров отдельных вызовов: среднее время вызова, запросов на вызов, пиковая память (Кб)"""
+    client = ApiClient(cache_scope=None)
+    client.replay = ReplayServer(cassette).start()
+    http_client.set_client(client)
+    results = {}
+    try:
+        for name, (func, args) in _helper_cases().items():
+            walls = []
+            for _ in range(repeat):
+                sent_before = len(client.timings.timings)
+                started = time.perf_counter()
+                for _ in range(HELPER_ITERATIONS):
+                    func(*args)
+                walls.append((time.perf_counter() - started) / HELPER_ITERATIONS)
+                requests_sent = (len(client.timings.timings) - sent_before) / HELPER_ITERATIONS
+
+            tracemalloc.start()
+            func(*args)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            results[name] = {'wall': min(walls), 'requests': requests_sent, 'peak_kb': peak // 1024}
+    finally:
+        http_client.set_client(None)
+        client.replay.stop()
+        client.close()
+    return results
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list:
+    """Функция поиска метрик, ухудшившихся относительно базовой линии больше чем на threshold"""
+    regressions = []
+    for name, metrics in baseline.items():
+        for metric, base in metrics.items():
+            value = current.get(name, {}).get(metric)
+            if value is not None and value > base * (1 + threshold) + MIN_DELTAS.get(metric, 0):
+                growth = value / base - 1 if base else 1
+                regressions.append(f'{name} {metric}: {base:g} -> {value:g} (+{growth:.0%})')
+    return regressions
+
+
+def _print_results(results: dict, baseline: dict):
+    print(f'{"замер":<48} {"время, мс":>10} {"запросов":>9} {"память, Кб":>11} {"база, мс":>9}')
+    for name, metrics in results.items():
+        base = baseline.get(name, {}).get('wall')
+        base_text = f'{base * 1000:>9.2f}' if base is not None else f'{"-":>9}'
+        print(f'{name:<48} {metrics["wall"] * 1000:>10.2f} {metrics["requests"]:>9g} {metrics["peak_kb"]:>11} '
+              f'{base_text}')
+
+
+def main(argv=None) -> int:
+    """Функция запуска бенчмарков из командной строки, возвращает код завершения"""
+    parser = argparse.ArgumentParser(description='Бенчмарки тестовой инфраструктуры')
+    parser.add_argument('--baseline', type=Path, default=DEFAULT_BASELINE, help='файл базовой линии')
+    parser.add_argument('--update-baseline', action='store_true', help='сохранить замеры как базовую линию')
+    parser.add_argument('--require-baseline', action='store_true',
+                        help='завершиться с ошибкой, если базовой линии нет (для CI)')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='допустимое ухудшение метрики, доля (по умолчанию 0.2)')
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT, help='кол-во повторов каждого замера')
+    parser.add_argument('--cassette', default=None, help='записанная кассета вместо синтетической')
+    args = parser.parse_args(argv)
+
+    cassette = Cassette.load(args.cassette) if args.cassette else build_cassette()
+    with tempfile.TemporaryDirectory() as tmp:
+        cassette_path = args.cassette or os.path.join(tmp, 'standin.json.gz')
+        if not args.cassette:
+            cassette.save(cassette_path)
+        results = bench_pytest(cassette_path, args.repeat)
+    results.update(bench_helpers(cassette, args.repeat))
+
+    baseline = {}
+    if args.baseline.exists():
+        baseline = json.loads(args.baseline.read_text(encoding='utf-8'))
+    _print_results(results, baseline)
+
+    if args.update_baseline:
+        args.baseline.write_text(json.dumps(results, indent=2, sort_keys=True), encoding='utf-8')
+        print(f'Базовая линия сохранена в {args.baseline}')
+        return 0
+    if not baseline:
+        if args.require_baseline:
+            print(f'Базовая линия {args.baseline} не найдена')
+            return 2
+        print(f'Базовая линия {args.baseline} не найдена, сравнение пропущено')
+        return 0
+
+    regressions = compare(results, baseline, args.threshold)
+    for regression in regressions:
+        print(f'РЕГРЕССИЯ {regression}')
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,109 @@
+"""Модуль детерминированной синтетической кассеты: локальная замена dog.ceo, openbrewerydb и jsonplaceholder"""
+import json
+import random
+import uuid
+from typing import Optional
+from harness.cassette import Cassette
+from test_brewery_api import INVALID_ID_SEED, make_invalid_brewery_id
+
+DOG_API = 'https://dog.ceo/api'
+BREWERY_API = 'https://api.openbrewerydb.org/v1/breweries'
+POSTS_API = 'https://jsonplaceholder.typicode.com/posts'
+JSON_HEADERS = {'Content-Type': 'application/json; charset=utf-8'}
+
+BREEDS = {'bulldog': 120, 'greyhound': 80, 'hound': 5000}
+SUB_BREEDS = [('hound', 'afghan'), ('mastiff', 'bull'), ('sheepdog', 'english')]
+BREWERY_TYPES = ['micro', 'nano', 'regional', 'brewpub', 'large', 'planning', 'bar', 'contract',
+                 'proprietor', 'closed']
+# кол-во пивоварен каждого типа для постраничного обхода
+PAGED_TYPES = {'nano': 450, 'large': 70}
+RANDOM_BREWERY_ID = '5128df48-79fc-4f0f-8b52-d06be54d0cec'
+
+
+def _json(payload) -> bytes:
+    return json.dumps(payload, separators=(',', ':')).encode('utf-8')
+
+
+def _brewery(rng: random.Random, brewery_type: str, brewery_id: Optional[str] = None) -> dict:
+    return {'id': brewery_id or str(uuid.UUID(int=rng.getrandbits(128))),
+            'name': f'Brewery {rng.randrange(10 ** 6)}',
+            'brewery_type': brewery_type,
+            'address_1': f'{rng.randrange(1, 9999)} Main St',
+            'city': 'Portland',
+            'state_province': 'Oregon',
+            'postal_code': f'{rng.randrange(10 ** 4, 10 ** 5)}',
+            'country': 'United States',
+            'longitude': f'{rng.uniform(-125, -67):.8f}',
+            'latitude': f'{rng.uniform(25, 49):.8f}',
+            'phone': f'{rng.randrange(10 ** 9, 10 ** 10)}',
+            'website_url': None,
+            'state': 'Oregon',
+            'street': f'{rng.randrange(1, 9999)} Main St'}
+
+
+def _images(path: str, count: int) -> list:
+    return [f'https://images.dog.ceo/breeds/{path}/n{index:08d}.jpg' for index in range(count)]
+
+
+def build_cassette(seed: int = 0) -> Cassette:
+    """Функция построения синтетической кассеты со всеми эндпоинтами, которые используют тесты"""
+    rng = random.Random(seed)
+    cassette = Cassette()
+
+    def add(method, url, status, payload, data=None):
+        body = payload if isinstance(payload, bytes) else _json(payload)
+        cassette.add(method, url, status, body, headers=JSON_HEADERS, data=data)
+
+    add('GET', f'{DOG_API}/breeds/list/all', 200,
+        {'message': {breed: [] for breed in BREEDS} | {'hound': ['afghan'], 'mastiff': ['bull'],
+                                                       'sheepdog': ['english']},
+         'status': 'success'})
+    for breed, count in BREEDS.items():
+        add('GET', f'{DOG_API}/breed/{breed}/images', 200,
+            {'message': _images(f'{breed}-common', count), 'status': 'success'})
+        add('GET', f'{DOG_API}/breed/{breed}/images/random', 200,
+            {'message': _images(f'{breed}-common', 1)[0], 'status': 'success'})
+    add('GET', f'{DOG_API}/breed/big_dog/images', 404,
+        {'status': 'error', 'message': 'Breed not found (main breed does not exist)', 'code': 404})
+    for breed, sub_breed in SUB_BREEDS:
+        add('GET', f'{DOG_API}/breed/{breed}/{sub_breed}/images', 200,
+            {'message': _images(f'{breed}-{sub_breed}', 40), 'status': 'success'})
+    for num in (3, 10, 100):
+        add('GET', f'{DOG_API}/breed/bulldog/images/random/{num}', 200,
+            {'message': _images('bulldog-common', num), 'status': 'success'})
+
+    add('GET', f'{BREWERY_API}/random', 200, [_brewery(rng, 'micro', RANDOM_BREWERY_ID)])
+    add('GET', f'{BREWERY_API}/{RANDOM_BREWERY_ID}', 200, _brewery(rng, 'micro', RANDOM_BREWERY_ID))
+    add('GET', f'{BREWERY_API}/{make_invalid_brewery_id(random.Random(INVALID_ID_SEED))}', 404,
+        {'message': "Couldn't find Brewery"})
+    for brewery_type in BREWERY_TYPES:
+        add('GET', f'{BREWERY_API}?by_type={brewery_type}', 200,
+            [_brewery(rng, brewery_type) for _ in range(50)])
+    add('GET', f'{BREWERY_API}?by_type=invalid_type_name', 400,
+        {'errors': ['Brewery type must include one of these types: ' + ', '.join(BREWERY_TYPES)]})
+    for num, count in (('', 50), ('50', 50), ('100', 100), ('200', 200), ('201', 200), ('500', 200)):
+        add('GET', f'{BREWERY_API}?per_page={num}', 200,
+            [_brewery(rng, rng.choice(BREWERY_TYPES)) for _ in range(count)])
+    for brewery_type, count in PAGED_TYPES.items():
+        breweries = [_brewery(rng, brewery_type) for _ in range(count)]
+        # с запасом на окно предзагрузки страниц за последней
+        for page in range(1, count // 200 + 10):
+            add('GET', f'{BREWERY_API}?per_page=200&page={page}&by_type={brewery_type}', 200,
+                breweries[(page - 1) * 200:page * 200])
+
+    posts = [{'userId': (index - 1) // 10 + 1, 'id': index, 'title': f'title {index}', 'body': f'body {index}'}
+             for index in range(1, 101)]
+    add('GET', POSTS_API, 200, posts)
+    for post in posts:
+        add('GET', f'{POSTS_API}/{post["id"]}', 200, post)
+    for user_id in range(1, 11):
+        add('GET', f'{POSTS_API}?userId={user_id}', 200, [post for post in posts if post['userId'] == user_id])
+    for post_id in (101, 200):
+        add('GET', f'{POSTS_API}/{post_id}', 404, {})
+    new_post = '{"id":null,"userId":1,"title":"some title","body":"some body"}'
+    add('POST', POSTS_API, 201, json.loads(new_post) | {'id': 101}, data=new_post)
+    add('PUT', f'{POSTS_API}/5', 200, json.loads(new_post) | {'id': 5}, data=new_post)
+
+    cassette.add('GET', 'https://ya.ru', 200, b'<!DOCTYPE html><html></html>',
+                 headers={'Content-Type': 'text/html; charset=utf-8'})
+    return cassette
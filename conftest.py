@@ -1,7 +1,547 @@
 """Модуль фикстур"""
+import itertools
+import uuid
+import pytest
+from harness import http_client
+from harness.cache import CACHE_SCOPES, DEFAULT_CACHE_SIZE
+from harness.cassette import Cassette, ReplayServer
+from harness.concurrent import DEFAULT_PER_HOST, ConcurrentPrefetcher
+from harness.conditional import DEFAULT_STORE_SIZE, ConditionalStore
+from harness.http_client import ApiClient
+from harness.lazy import LazyParam, LazyParamResolver
+from harness.load import DEFAULT_CONCURRENCY, DEFAULT_DURATION, DEFAULT_RAMP_UP, LoadRunner, prepare_client
+from harness.ratelimit import DEFAULT_BURST
+from harness.shared_cache import DEFAULT_SHARED_CACHE_SIZE, DEFAULT_SHARED_TTL, SharedResponseCache
+from harness.spec import SPEC_SUFFIXES, SpecError, check_case, load_index, send_case
+
+api_client_key = pytest.StashKey[ApiClient]()
+lazy_resolver_key = pytest.StashKey[LazyParamResolver]()
+prefetched_groups_key = pytest.StashKey[dict]()
+prefetch_group_key = pytest.StashKey[tuple]()
+load_runner_key = pytest.StashKey[LoadRunner]()
+latency_budgets_key = pytest.StashKey[list]()
+shared_cache_stats_key = pytest.StashKey[list]()
+
+DEFAULT_URL = "https://ya.ru"
+DEFAULT_STATUS_CODE = 200
+# сколько кейсов спецификации предзагружается за раз (ответы держатся в памяти до конца своей порции)
+SPEC_PREFETCH_CHUNK = 256
 
 
 def pytest_addoption(parser):
     """Pytest hook для добавления кастомных параметров командной строки"""
-    parser.addoption("--url", action="store", default="https://ya.ru", help="url")
-    parser.addoption("--status_code", action="store", default=200, help="status_code")
\ No newline at end of file
+    parser.addoption("--url", action="append", default=[],
+                     help="url (можно повторять, каждый url - отдельный кейс test_req_addopt)")
+    parser.addoption("--status_code", action="append", default=[], type=int,
+                     help="status_code (один на все url или по одному на каждый --url)")
+    parser.addoption("--url-file", action="store", default=None, metavar="PATH",
+                     help="файл со строками 'URL [STATUS_CODE]' для test_req_addopt (# - комментарий)")
+    parser.addoption("--url-no-redirects", action="store_true", default=False,
+                     help="не следовать редиректам при проверке url (проверяется код первого ответа)")
+    parser.addoption("--http-pool-size", action="store", default=http_client.DEFAULT_POOL_SIZE, type=int,
+                     help="кол-во keep-alive соединений в пуле на один хост")
+    parser.addoption("--http-retries", action="store", default=http_client.DEFAULT_RETRIES, type=int,
+                     help="кол-во повторов запроса при ошибках соединения и кодах 429/5xx")
+    parser.addoption("--http-backoff", action="store", default=http_client.DEFAULT_BACKOFF, type=float,
+                     help="коэффициент экспоненциальной задержки между повторами, сек")
+    parser.addoption("--rate-limit", action="store", default=None, type=float,
+                     help="максимальная частота запросов к одному хосту, запросов/сек (по умолчанию без "
+                          "ограничения до первого ответа 429; дальше частота подстраивается под сервер)")
+    parser.addoption("--rate-burst", action="store", default=DEFAULT_BURST, type=int,
+                     help="кол-во запросов к хосту, которые можно отправить подряд без ожидания")
+    parser.addoption("--http-timeout", action="store", default=http_client.DEFAULT_TIMEOUT, type=float,
+                     help="таймаут запроса по умолчанию, сек")
+    parser.addoption("--response-cache", action="store", default="test", choices=("off",) + CACHE_SCOPES,
+                     help="область видимости мемоизации идемпотентных запросов")
+    parser.addoption("--response-cache-size", action="store", default=DEFAULT_CACHE_SIZE, type=int,
+                     help="максимальное кол-во ответов в кэше одной области видимости")
+    parser.addoption("--shared-cache", action="store_true", default=False,
+                     help="общий для всех процессов (воркеров xdist) кэш идемпотентных запросов в SQLite: "
+                          "каждый уникальный запрос отправляется один раз за прогон")
+    parser.addoption("--shared-cache-ttl", action="store", default=DEFAULT_SHARED_TTL, type=float,
+                     help="время жизни записи общего кэша, сек")
+    parser.addoption("--shared-cache-size", action="store", default=DEFAULT_SHARED_CACHE_SIZE, type=int,
+                     help="максимальное кол-во записей общего кэша")
+    parser.addoption("--no-conditional-requests", action="store_true", default=False,
+                     help="не сохранять ответы с ETag/Last-Modified между прогонами и не отправлять условные запросы")
+    parser.addoption("--conditional-store-size", action="store", default=DEFAULT_STORE_SIZE, type=int,
+                     help="максимальное кол-во ответов в хранилище условных запросов")
+    parser.addoption("--record", action="store", default=None, metavar="PATH",
+                     help="записать все HTTP-обмены в кассету PATH")
+    parser.addoption("--replay", action="store", default=None, metavar="PATH",
+                     help="отдавать ответы из кассеты PATH через локальный сервер, без сети")
+    parser.addoption("--api-concurrency", action="store", default=DEFAULT_PER_HOST, type=int,
+                     help="кол-во одновременных запросов к хосту при предзагрузке кейсов тестов с маркером "
+                          "api_concurrent (0 - без предзагрузки; не больше --http-pool-size)")
+    parser.addoption("--load", action="store_true", default=False,
+                     help="вместо тестов запустить нагрузку сценариями LOAD_SCENARIOS из выбранных модулей")
+    parser.addoption("--load-concurrency", action="store", default=DEFAULT_CONCURRENCY, type=int,
+                     help="кол-во одновременно работающих потоков нагрузки")
+    parser.addoption("--load-duration", action="store", default=DEFAULT_DURATION, type=float,
+                     help="длительность нагрузки, сек")
+    parser.addoption("--load-ramp-up", action="store", default=DEFAULT_RAMP_UP, type=float,
+                     help="время, за которое равномерно стартуют все потоки нагрузки, сек")
+    parser.addoption("--latency-report", action="store", default=None, metavar="PATH",
+                     help="сохранить замеры запросов по фазам в PATH (.csv или .json с гистограммой)")
+    parser.addoption("--latency-top", action="store", default=10, type=int,
+                     help="кол-во самых медленных эндпоинтов в итоговом отчете (0 - не выводить)")
+    parser.addoption("--latency-budget", action="append", default=[], metavar="[ENDPOINT=]MS",
+                     help="бюджет задержки запроса в мс (для всех запросов или для эндпоинтов, "
+                          "содержащих ENDPOINT); тест с запросом сверх бюджета падает")
+
+
+def _url_targets(config):
+    """Функция сбора проверяемых пар (url, ожидаемый код) из параметров --url, --status_code и --url-file"""
+    urls = config.getoption("--url")
+    status_codes = config.getoption("--status_code")
+    url_file = config.getoption("--url-file")
+    if len(status_codes) > 1 and len(status_codes) != len(urls):
+        raise pytest.UsageError("Параметр --status_code задается один раз или по одному на каждый --url")
+    default_status = status_codes[0] if len(status_codes) == 1 else DEFAULT_STATUS_CODE
+    if not urls and not url_file:
+        urls = [DEFAULT_URL]
+
+    targets = list(zip(urls, status_codes if len(status_codes) > 1 else [default_status] * len(urls)))
+    if url_file:
+        with open(url_file, encoding="utf-8") as file:
+            for line_number, line in enumerate(file, 1):
+                fields = line.split("#", 1)[0].split()
+                if not fields:
+                    continue
+                if len(fields) > 2 or (len(fields) == 2 and not fields[1].isdigit()):
+                    raise pytest.UsageError(f"{url_file}:{line_number}: ожидается 'URL [STATUS_CODE]'")
+                targets.append((fields[0], int(fields[1]) if len(fields) == 2 else default_status))
+    return targets
+
+
+def pytest_generate_tests(metafunc):
+    """Pytest hook для параметризации test_req_addopt всеми проверяемыми url"""
+    if {"url", "status_code", "follow_redirects"} <= set(metafunc.fixturenames):
+        targets = _url_targets(metafunc.config)
+        follow_redirects = not metafunc.config.getoption("--url-no-redirects")
+        metafunc.parametrize(("url", "status_code", "follow_redirects"),
+                             [(url, status_code, follow_redirects) for url, status_code in targets],
+                             ids=[f"{url}-{status_code}" for url, status_code in targets])
+
+
+def _cache_scope(value):
+    """Функция приведения значения параметра --response-cache к области видимости клиента"""
+    return None if value == "off" else value
+
+
+def pytest_configure(config):
+    """Pytest hook для регистрации кастомных маркеров и создания общего HTTP-клиента
+    (клиент нужен уже на этапе сбора тестов)"""
+    config.addinivalue_line("markers",
+                            "response_cache(scope): область видимости кэша ответов для теста "
+                            "(off, test, module, session)")
+    config.addinivalue_line("markers",
+                            "api_concurrent(prefetch=func): перед первым кейсом параметризованного теста "
+                            "вызвать prefetch(*params) для всех кейсов одновременно")
+    config.addinivalue_line("markers",
+                            "latency_budget(ms, endpoint=None): бюджет задержки запросов теста "
+                            "(всех или к эндпоинтам, содержащим endpoint), мс")
+
+    if config.getoption("--record") and config.getoption("--replay"):
+        raise pytest.UsageError("Параметры --record и --replay нельзя использовать одновременно")
+    config.stash[latency_budgets_key] = _parse_latency_budgets(config.getoption("--latency-budget"))
+
+    pool_size = config.getoption("--http-pool-size")
+    if config.getoption("--load"):
+        pool_size = max(pool_size, config.getoption("--load-concurrency"))
+    client = ApiClient(pool_size=pool_size,
+                       retries=config.getoption("--http-retries"),
+                       backoff=config.getoption("--http-backoff"),
+                       timeout=config.getoption("--http-timeout"),
+                       cache_scope=_cache_scope(config.getoption("--response-cache")),
+                       cache_size=config.getoption("--response-cache-size"),
+                       rate_limit=config.getoption("--rate-limit"),
+                       rate_burst=config.getoption("--rate-burst"))
+    if config.getoption("--record"):
+        client.recorder = Cassette()
+    if config.getoption("--replay"):
+        client.replay = ReplayServer(Cassette.load(config.getoption("--replay"))).start()
+    if config.getoption("--shared-cache"):
+        client.shared_cache = _shared_cache(config)
+    client.conditional = _conditional_store(config)
+    http_client.set_client(client)
+    config.stash[api_client_key] = client
+    config.stash[shared_cache_stats_key] = [0, 0]
+    config.stash[lazy_resolver_key] = _lazy_resolver(config)
+    config.stash[prefetched_groups_key] = {}
+
+
+def _lazy_resolver(config):
+    """Функция создания вычислителя ленивых параметров
+    (в воркере xdist значения разделяются с остальными воркерами через кэш pytest)"""
+    workerinput = getattr(config, "workerinput", None)
+    if workerinput is None or getattr(config, "cache", None) is None:
+        return LazyParamResolver()
+    return LazyParamResolver(store_path=config.cache.mkdir("lazy_params") / "values.json",
+                             run_id=workerinput["testrunuid"])
+
+
+def _shared_cache(config):
+    """Функция создания общего для воркеров xdist кэша ответов в каталоге кэша pytest
+    (записи разделяются между процессами одного прогона)"""
+    if getattr(config, "cache", None) is None:
+        raise pytest.UsageError("Для --shared-cache нужен плагин cacheprovider (уберите -p no:cacheprovider)")
+    workerinput = getattr(config, "workerinput", None)
+    run_id = workerinput["testrunuid"] if workerinput is not None else uuid.uuid4().hex
+    return SharedResponseCache(config.cache.mkdir("shared_responses") / "responses.sqlite", run_id,
+                               ttl=config.getoption("--shared-cache-ttl"),
+                               maxsize=config.getoption("--shared-cache-size"))
+
+
+def _conditional_store(config):
+    """Функция создания хранилища ответов для условных запросов в каталоге кэша pytest
+    (не используется при записи и воспроизведении кассет, без плагина cacheprovider и под нагрузкой,
+    где ответы 304 из локального хранилища исказили бы измерения)"""
+    cache = getattr(config, "cache", None)
+    if (cache is None or config.getoption("--no-conditional-requests") or config.getoption("--load")
+            or config.getoption("--record") or config.getoption("--replay")):
+        return None
+    return ConditionalStore(cache.mkdir("conditional_requests") / "validators.sqlite",
+                            maxsize=config.getoption("--conditional-store-size"))
+
+
+def pytest_sessionfinish(session):
+    """Pytest hook для передачи статистики общего кэша и записанных обменов из воркера xdist в основной процесс"""
+    client = session.config.stash.get(api_client_key, None)
+    workeroutput = getattr(session.config, "workeroutput", None)
+    if client is None or workeroutput is None:
+        return
+    if client.shared_cache is not None:
+        workeroutput["shared_cache_stats"] = (client.shared_cache.hits, client.shared_cache.misses)
+    if client.recorder is not None:
+        workeroutput["cassette"] = client.recorder.exchanges
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_testnodedown(node, error):
+    """Pytest hook (xdist) для суммирования статистики общего кэша завершившегося воркера
+    и добавления его обменов в кассету основного процесса"""
+    workeroutput = getattr(node, "workeroutput", {})
+    hits, misses = workeroutput.get("shared_cache_stats", (0, 0))
+    stats = node.config.stash[shared_cache_stats_key]
+    stats[0] += hits
+    stats[1] += misses
+    recorder = node.config.stash[api_client_key].recorder
+    if recorder is not None:
+        recorder.merge(workeroutput.get("cassette", {}))
+
+
+def pytest_unconfigure(config):
+    """Pytest hook для сохранения кассеты и закрытия общего HTTP-клиента"""
+    client = config.stash.get(api_client_key, None)
+    if client is None:
+        return
+    # воркеры xdist передают обмены основному процессу, кассету сохраняет только он
+    if client.recorder is not None and not hasattr(config, "workerinput"):
+        client.recorder.save(config.getoption("--record"))
+    if client.replay is not None:
+        client.replay.stop()
+    http_client.set_client(None)
+    client.close()
+
+
+def pytest_runtestloop(session):
+    """Pytest hook для запуска нагрузки вместо тестов в режиме --load"""
+    config = session.config
+    if not config.getoption("--load") or config.option.collectonly:
+        return None
+
+    scenarios = []
+    modules = {item.module for item in session.items if hasattr(item, "module")}
+    for module in sorted(modules, key=lambda module: module.__name__):
+        scenarios.extend(getattr(module, "LOAD_SCENARIOS", []))
+    if not scenarios:
+        raise pytest.UsageError("--load: в выбранных модулях нет сценариев нагрузки (список LOAD_SCENARIOS)")
+    prepare_client(config.stash[api_client_key])
+    runner = LoadRunner(scenarios,
+                        concurrency=config.getoption("--load-concurrency"),
+                        duration=config.getoption("--load-duration"),
+                        ramp_up=config.getoption("--load-ramp-up"))
+    runner.run()
+    config.stash[load_runner_key] = runner
+    return True
+
+
+@pytest.hookimpl(wrapper=True)
+def pytest_runtest_setup(item):
+    """Pytest hook для привязки запросов к тесту, предзагрузки ответов группы кейсов до setup теста
+    и вычисления ленивых параметров после setup фикстур теста"""
+    item.config.stash[api_client_key].node_id = item.nodeid
+    _prefetch_group(item)
+    result = yield
+    resolver = item.config.stash[lazy_resolver_key]
+    funcargs = getattr(item, "funcargs", {})
+    for name, value in funcargs.items():
+        if isinstance(value, LazyParam):
+            funcargs[name] = resolver.resolve(value)
+    return result
+
+
+@pytest.hookimpl(wrapper=True)
+def pytest_runtest_call(item):
+    """Pytest hook для проверки бюджетов задержки запросов, отправленных тестом"""
+    result = yield
+    budgets = _latency_budgets(item)
+    if budgets:
+        client = item.config.stash[api_client_key]
+        exceeded = [f'{timing.endpoint}: {timing.total * 1000:.0f} мс > {limit:.0f} мс'
+                    for timing in client.timings.by_node.get(item.nodeid, [])
+                    for endpoint, limit in budgets
+                    if (endpoint is None or endpoint in timing.endpoint) and timing.total * 1000 > limit]
+        if exceeded:
+            pytest.fail('Превышен бюджет задержки запросов:\n' + '\n'.join(exceeded))
+    return result
+
+
+def _parse_latency_budgets(values: list) -> list:
+    """Функция разбора значений параметра --latency-budget: список (подстрока эндпоинта или None, мс)"""
+    budgets = []
+    for value in values:
+        endpoint, _, limit = value.rpartition("=")
+        try:
+            budgets.append((endpoint or None, float(limit)))
+        except ValueError:
+            raise pytest.UsageError(f"--latency-budget={value}: ожидается [ENDPOINT=]MS") from None
+    return budgets
+
+
+def _latency_budgets(item):
+    """Функция сбора бюджетов задержки теста из маркеров latency_budget и параметра --latency-budget:
+    список (подстрока эндпоинта или None, мс)"""
+    budgets = list(item.config.stash[latency_budgets_key])
+    for marker in item.iter_markers("latency_budget"):
+        budgets.append((marker.kwargs.get("endpoint"), float(marker.args[0])))
+    return budgets
+
+
+def _prefetch_group(item):
+    """Функция одновременной предзагрузки ответов для всех кейсов теста с маркером api_concurrent"""
+    marker = item.get_closest_marker("api_concurrent")
+    if marker is None or not hasattr(item, "callspec") or not _prefetch_enabled(item.config):
+        return
+    group = (item.parent.nodeid, item.originalname)
+    if group in item.config.stash[prefetched_groups_key]:
+        return
+
+    resolver = item.config.stash[lazy_resolver_key]
+    prefetch = marker.kwargs["prefetch"]
+    cases = [case for case in item.session.items
+             if case.parent is item.parent and getattr(case, "originalname", None) == item.originalname]
+    calls = [(prefetch, tuple(resolver.resolve(value) if isinstance(value, LazyParam) else value
+                              for value in case.callspec.params.values()), case.nodeid)
+             for case in cases]
+    _run_prefetch(item.config, group, cases, calls)
+
+
+def _prefetch_enabled(config) -> bool:
+    """Функция проверки, включена ли предзагрузка: в воркере xdist session.items - вся коллекция,
+    а кейсы раздаются воркерам по ходу прогона, поэтому предзагрузка отключается"""
+    return config.getoption("--api-concurrency") > 0 and not hasattr(config, "workerinput")
+
+
+def _run_prefetch(config, group, cases: list, calls: list):
+    """Функция предзагрузки ответов группы кейсов: ключи сохраненных ответов запоминаются,
+    чтобы удалить невостребованные после последнего кейса группы"""
+    client = config.stash[api_client_key]
+    before = set(client.prefetched)
+    ConcurrentPrefetcher(client, per_host=config.getoption("--api-concurrency")).run(calls)
+    config.stash[prefetched_groups_key][group] = ({case.nodeid for case in cases}, set(client.prefetched) - before)
+    for case in cases:
+        case.stash[prefetch_group_key] = group
+
+
+@pytest.hookimpl(wrapper=True)
+def pytest_runtest_teardown(item):
+    """Pytest hook для отвязки запросов от теста после teardown его фикстур и удаления невостребованных
+    предзагруженных ответов после последнего кейса группы (например, если тест упал до запроса)"""
+    client = item.config.stash[api_client_key]
+    try:
+        return (yield)
+    finally:
+        client.node_id = None
+        _release_prefetched(item, client)
+
+
+def _release_prefetched(item, client):
+    """Функция удаления невостребованных предзагруженных ответов группы после ее последнего кейса"""
+    group = item.stash.get(prefetch_group_key, None)
+    if group is None:
+        return
+    pending, keys = item.config.stash[prefetched_groups_key][group]
+    pending.discard(item.nodeid)
+    if not pending:
+        for key in keys:
+            client.prefetched.pop(key, None)
+        keys.clear()
+
+
+def pytest_collect_file(file_path, parent):
+    """Pytest hook для сбора кейсов из файлов спецификаций эндпоинтов spec_*.yaml/.yml/.json"""
+    if file_path.suffix in SPEC_SUFFIXES and file_path.name.startswith("spec_"):
+        return SpecFile.from_parent(parent, path=file_path)
+    return None
+
+
+class SpecFile(pytest.File):
+    """Класс файла спецификации: кейсы берутся из индекса, разобранного один раз и сохраненного в кэше pytest"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.selected = None
+
+    def collect(self):
+        cache = getattr(self.config, "cache", None)
+        cache_dir = cache.mkdir("spec_index") if cache is not None else None
+        try:
+            cases = load_index(self.path, cache_dir)
+        except SpecError as error:
+            raise self.CollectError(str(error)) from error
+        for case in cases:
+            yield SpecItem.from_parent(self, name=case["id"], case=case)
+
+    def prefetch(self, item):
+        """Функция одновременной предзагрузки ответов перед кейсом item для него и следующих выбранных кейсов
+        того же эндпоинта, не больше SPEC_PREFETCH_CHUNK за раз"""
+        if item.stash.get(prefetch_group_key, None) is not None or not _prefetch_enabled(self.config):
+            return
+        if self.selected is None:
+            self.selected = [case for case in self.session.items if case.parent is self]
+        start = self.selected.index(item)
+        chunk = list(itertools.takewhile(lambda case: case.case["endpoint"] == item.case["endpoint"],
+                                         self.selected[start:start + SPEC_PREFETCH_CHUNK]))
+        if len(chunk) > 1:
+            _run_prefetch(self.config, (self.nodeid, item.name), chunk,
+                          [(send_case, (case.case,), case.nodeid) for case in chunk])
+
+
+class SpecItem(pytest.Item):
+    """Класс кейса из спецификации: запрос эндпоинта и проверка ответа"""
+
+    def __init__(self, *, case, **kwargs):
+        super().__init__(**kwargs)
+        self.case = case
+
+    def setup(self):
+        self.parent.prefetch(self)
+
+    def runtest(self):
+        check_case(self.case, send_case(self.case))
+
+    def teardown(self):
+        self.config.stash[api_client_key].clear_cache("test")
+
+    def repr_failure(self, excinfo, style=None):
+        if isinstance(excinfo.value, AssertionError):
+            return f'{self.case["method"]} {self.case["url"]}\n{excinfo.value}'
+        return super().repr_failure(excinfo, style)
+
+    def reportinfo(self):
+        return self.path, None, self.name
+
+
+@pytest.fixture(scope='session')
+def api_client(pytestconfig):
+    """Фикстура общего HTTP-клиента с пулом соединений на всю тестовую сессию"""
+    return pytestconfig.stash[api_client_key]
+
+
+@pytest.fixture(scope='module', autouse=True)
+def module_response_cache(api_client):
+    """Фикстура сброса кэша ответов области видимости module после модуля"""
+    yield
+    api_client.clear_cache('module')
+
+
+@pytest.fixture(autouse=True)
+def per_test_response_cache(request, api_client):
+    """Фикстура сброса кэша ответов области видимости test после теста
+    + переопределение области видимости маркером response_cache"""
+    marker = request.node.get_closest_marker('response_cache')
+    default_scope = api_client.cache_scope
+    if marker is not None:
+        api_client.cache_scope = _cache_scope(marker.args[0])
+    yield
+    api_client.cache_scope = default_scope
+    api_client.clear_cache('test')
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    """Pytest hook для вывода статистики переиспользования соединений, кэша ответов и кассеты"""
+    client = config.stash.get(api_client_key, None)
+    if client is None:
+        return
+
+    stats = client.connection_stats()
+    if stats:
+        terminalreporter.write_sep('-', 'HTTP connection reuse')
+        for host, (connections, requests_sent) in sorted(stats.items()):
+            terminalreporter.write_line(f'{host}: запросов {requests_sent}, соединений {connections}, '
+                                        f'переиспользовано {requests_sent - connections}')
+
+    throttled = {host: stats for host, stats in client.throttle_stats().items() if stats[1] or stats[3]}
+    if throttled:
+        terminalreporter.write_sep('-', 'HTTP rate limiting')
+        for host, (requests_sent, retries, throttled_responses, waited, rate) in sorted(throttled.items()):
+            terminalreporter.write_line(f'{host}: запросов {requests_sent}, повторов {retries}, '
+                                        f'ответов 429 {throttled_responses}, ожидание {waited:.1f} сек, '
+                                        f'лимит {rate:.1f} запросов/сек')
+
+    cache_stats = client.cache_stats()
+    if any(hits or misses for hits, misses in cache_stats.values()):
+        terminalreporter.write_sep('-', 'HTTP response cache')
+        for scope, (hits, misses) in cache_stats.items():
+            terminalreporter.write_line(f'{scope}: попаданий {hits}, промахов {misses}')
+
+    wire_size, decoded_size = client.timings.transfer_totals()
+    conditional = client.conditional
+    if decoded_size or (conditional is not None and conditional.revalidated):
+        terminalreporter.write_sep('-', 'HTTP transfer')
+        terminalreporter.write_line(f'получено по сети {wire_size / 1024:.1f} Кб '
+                                    f'(после распаковки {decoded_size / 1024:.1f} Кб)')
+        if conditional is not None and conditional.revalidated:
+            terminalreporter.write_line(f'условных запросов {conditional.revalidated}, '
+                                        f'не изменилось (304) {conditional.not_modified}, '
+                                        f'сэкономлено {conditional.saved_bytes / 1024:.1f} Кб, '
+                                        f'~{conditional.saved_seconds:.2f} сек')
+
+    shared_hits, shared_misses = config.stash[shared_cache_stats_key]
+    if client.shared_cache is not None:
+        shared_hits += client.shared_cache.hits
+        shared_misses += client.shared_cache.misses
+    if shared_hits or shared_misses:
+        terminalreporter.write_sep('-', 'HTTP shared response cache')
+        terminalreporter.write_line(f'попаданий {shared_hits}, промахов (отправлено запросов) {shared_misses}')
+
+    top = config.getoption("--latency-top")
+    slowest = client.timings.slowest_endpoints(top) if top > 0 else []
+    if slowest:
+        terminalreporter.write_sep('-', 'Slowest endpoints')
+        terminalreporter.write_line(f'{"эндпоинт":<70} {"кол-во":>6} {"сред, мс":>9} {"макс, мс":>9}  '
+                                    f'фазы (dns/connect/tls/send/ttfb/transfer), мс')
+        for endpoint, count, mean, longest, phases in slowest:
+            breakdown = '/'.join(f'{seconds * 1000:.1f}' for seconds in phases.values())
+            terminalreporter.write_line(f'{endpoint:<70} {count:>6} {mean * 1000:>9.1f} {longest * 1000:>9.1f}  '
+                                        f'{breakdown}')
+    report_path = config.getoption("--latency-report")
+    if report_path:
+        client.timings.write_report(report_path)
+        terminalreporter.write_line(f'замеры запросов сохранены в {report_path}')
+
+    runner = config.stash.get(load_runner_key, None)
+    if runner is not None:
+        terminalreporter.write_sep('-', f'Load: {runner.concurrency} потоков, {runner.elapsed:.1f} сек')
+        for line in runner.report():
+            terminalreporter.write_line(line)
+
+    if client.recorder is not None:
+        terminalreporter.write_sep('-', 'HTTP cassette')
+        terminalreporter.write_line(f'записано обменов: {len(client.recorder)} -> {config.getoption("--record")}')
+    if client.replay is not None:
+        terminalreporter.write_sep('-', 'HTTP cassette')
+        terminalreporter.write_line(f'воспроизведено: {client.replay.hits}, '
+                                    f'не найдено в кассете: {client.replay.misses}')
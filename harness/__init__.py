@@ -0,0 +1,4 @@
+"""Пакет вспомогательной инфраструктуры для API-тестов"""
+from harness.http_client import ApiClient, get_client, set_client
+
+__all__ = ['ApiClient', 'get_client', 'set_client']
@@ -0,0 +1,86 @@
+"""Модуль мемоизации ответов на повторяющиеся запросы"""
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Optional
+from urllib.parse import urlencode
+import requests
+
+CACHE_SCOPES = ('test', 'module', 'session')
+IDEMPOTENT_METHODS = frozenset({'GET', 'HEAD'})
+DEFAULT_CACHE_SIZE = 256
+
+
+class CachedJsonResponse(requests.Response):
+    """Класс ответа, тело которого разбирается как JSON только один раз"""
+
+    def json(self, **kwargs):
+        if kwargs:
+            return super().json(**kwargs)
+        if '_parsed_json' not in self.__dict__:
+            self._parsed_json = super().json()
+        return self._parsed_json
+
+
+def memoize_json(response: requests.Response) -> requests.Response:
+    """Функция подмены класса ответа для однократного разбора JSON"""
+    if not isinstance(response, CachedJsonResponse):
+        response.__class__ = CachedJsonResponse
+    return response
+
+
+def request_key(method: str, url: str, params=None, data=None, json_body=None) -> str:
+    """Функция вычисления ключа запроса по методу, url, query-параметрам и телу"""
+    if params:
+        items = sorted(params.items()) if isinstance(params, dict) else list(params)
+        url = f'{url}{"&" if "?" in url else "?"}{urlencode(items, doseq=True)}'
+    if json_body is not None:
+        data = json.dumps(json_body, sort_keys=True)
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    digest = hashlib.sha1(data).hexdigest() if data else ''
+    return f'{method.upper()} {url} {digest}'.rstrip()
+
+
+def is_cacheable(method: str, response: requests.Response) -> bool:
+    """Функция проверки, можно ли переиспользовать ответ для повторного запроса"""
+    return method.upper() in IDEMPOTENT_METHODS and response.status_code < 500 and response.status_code != 429
+
+
+class ResponseCache:
+    """Класс LRU-кэша ответов с ограничением по кол-ву записей"""
+
+    def __init__(self, maxsize: int = DEFAULT_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[requests.Response]:
+        """Функция получения ответа из кэша по ключу запроса"""
+        with self._lock:
+            response = self._entries.get(key)
+            if response is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return response
+
+    def put(self, key: str, response: requests.Response):
+        """Функция сохранения ответа в кэш с вытеснением самой старой записи"""
+        with self._lock:
+            self._entries[key] = response
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Функция очистки кэша"""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,156 @@
+"""Модуль записи и воспроизведения HTTP-обменов (кассет) для запуска тестов без сети"""
+import base64
+import gzip
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from urllib.parse import urlsplit
+import requests
+from harness.cache import request_key
+
+CASSETTE_VERSION = 1
+SKIPPED_HEADERS = frozenset({'connection', 'content-encoding', 'content-length', 'keep-alive',
+                             'transfer-encoding', 'set-cookie'})
+# заголовок ответа локального сервера на запрос, которого нет в кассете
+MISS_HEADER = 'X-Cassette-Miss'
+
+
+class CassetteMiss(requests.RequestException):
+    """Класс ошибки воспроизведения: обмен не записан в кассету"""
+
+
+class Cassette:
+    """Класс кассеты: индекс обменов по ключу запроса, хранится на диске в виде сжатого JSON"""
+
+    def __init__(self, exchanges: Optional[dict] = None):
+        self.exchanges = exchanges if exchanges is not None else {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path: str) -> 'Cassette':
+        """Функция загрузки кассеты из файла"""
+        with gzip.open(path, 'rt', encoding='utf-8') as file:
+            data = json.load(file)
+        if data.get('version') != CASSETTE_VERSION:
+            raise ValueError(f'Неподдерживаемая версия кассеты {path}: {data.get("version")}')
+        return cls(data['exchanges'])
+
+    def save(self, path: str):
+        """Функция сохранения кассеты в файл"""
+        with gzip.open(path, 'wt', encoding='utf-8') as file:
+            json.dump({'version': CASSETTE_VERSION, 'exchanges': self.exchanges}, file,
+                      ensure_ascii=False, separators=(',', ':'))
+
+    def record(self, response: requests.Response):
+        """Функция записи обмена (исходный запрос до редиректов -> итоговый ответ)"""
+        sent = response.history[0].request if response.history else response.request
+        key = request_key(sent.method, sent.url, data=sent.body)
+        headers = {name: value for name, value in response.headers.items()
+                   if name.lower() not in SKIPPED_HEADERS}
+        entry = [response.status_code, headers, base64.b64encode(response.content).decode('ascii')]
+        with self._lock:
+            self.exchanges[key] = entry
+
+    def add(self, method: str, url: str, status: int, body: bytes, headers: Optional[dict] = None, data=None):
+        """Функция добавления обмена вручную (например, для синтетической кассеты)"""
+        sent = requests.Request(method, url, data=data).prepare()
+        entry = [status, headers or {}, base64.b64encode(body).decode('ascii')]
+        with self._lock:
+            self.exchanges[request_key(sent.method, sent.url, data=sent.body)] = entry
+
+    def merge(self, exchanges: dict):
+        """Функция добавления обменов другой кассеты (например, записанной воркером xdist)"""
+        with self._lock:
+            self.exchanges.update(exchanges)
+
+    def lookup(self, key: str) -> Optional[tuple]:
+        """Функция поиска обмена по ключу запроса: (status, headers, body) или None"""
+        entry = self.exchanges.get(key)
+        if entry is None:
+            return None
+        status, headers, body = entry
+        return status, headers, base64.b64decode(body)
+
+    def __len__(self):
+        return len(self.exchanges)
+
+
+class _ReplayHandler(BaseHTTPRequestHandler):
+    """Класс обработчика запросов локального сервера воспроизведения"""
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def _replay(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else None
+        scheme, _, rest = self.path.lstrip('/').partition('/')
+        url = f'{scheme}://{rest}'
+        found = self.server.replay.serve(self.command, url, body)
+        if found is None:
+            status, headers, payload = 404, {'Content-Type': 'application/json', MISS_HEADER: '1'}, \
+                json.dumps({'message': f'Обмен не записан в кассету: {self.command} {url}'}).encode('utf-8')
+        else:
+            status, headers, payload = found
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(payload)
+
+    do_GET = do_HEAD = do_POST = do_PUT = do_PATCH = do_DELETE = _replay
+
+    def log_message(self, *args):
+        pass
+
+
+class ReplayServer:
+    """Класс локального HTTP-сервера, отдающего ответы из кассеты вместо реальных API"""
+
+    def __init__(self, cassette: Cassette, host: str = '127.0.0.1', port: int = 0):
+        self.cassette = cassette
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), _ReplayHandler)
+        self._server.daemon_threads = True
+        self._server.replay = self
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        """Адрес локального сервера"""
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self) -> 'ReplayServer':
+        """Функция запуска сервера в фоновом потоке"""
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Функция остановки сервера"""
+        self._server.shutdown()
+        self._server.server_close()
+
+    def rewrite(self, url: str) -> str:
+        """Функция перенаправления url реального API на локальный сервер"""
+        parts = urlsplit(url)
+        if not parts.netloc:
+            return url
+        query = f'?{parts.query}' if parts.query else ''
+        return f'{self.base_url}/{parts.scheme}/{parts.netloc}{parts.path or "/"}{query}'
+
+    def serve(self, method: str, url: str, body: Optional[bytes]) -> Optional[tuple]:
+        """Функция поиска записанного ответа на запрос (HEAD без своей записи отвечает заголовками GET)"""
+        found = self.cassette.lookup(request_key(method, url, data=body))
+        if found is None and method == 'HEAD':
+            found = self.cassette.lookup(request_key('GET', url))
+        with self._lock:
+            if found is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return found
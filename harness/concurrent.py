@@ -0,0 +1,55 @@
+"""Модуль конкурентной предзагрузки ответов для всех кейсов параметризованного теста"""
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Callable, Iterable, Optional
+from urllib.parse import urlsplit
+
+DEFAULT_PER_HOST = 8
+# верхняя граница кол-ва потоков предзагрузки независимо от кол-ва кейсов
+MAX_WORKERS = 64
+
+
+class HostLimiter:
+    """Класс ограничения кол-ва одновременных запросов к одному хосту"""
+
+    def __init__(self, per_host: int = DEFAULT_PER_HOST):
+        self.per_host = per_host
+        self._slots = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def slot(self, url: str):
+        """Контекстный менеджер занятия слота хоста на время запроса"""
+        host = urlsplit(url).netloc
+        with self._lock:
+            semaphore = self._slots.setdefault(host, threading.BoundedSemaphore(self.per_host))
+        with semaphore:
+            yield
+
+
+class ConcurrentPrefetcher:
+    """Класс конкурентного выполнения вызовов хелперов в event loop asyncio:
+    ответы на запросы, отправленные внутри вызовов, складываются в client.prefetched
+    и отдаются клиентом при повторном запросе из теста"""
+
+    def __init__(self, client, per_host: int = DEFAULT_PER_HOST):
+        self.client = client
+        self.limiter = HostLimiter(per_host)
+
+    def run(self, calls: Iterable[tuple[Callable, tuple, Optional[str]]]) -> list:
+        """Функция одновременного выполнения вызовов (func, args, node_id теста),
+        возвращает результаты или исключения"""
+        return asyncio.run(self._gather(list(calls)))
+
+    async def _gather(self, calls: list) -> list:
+        loop = asyncio.get_running_loop()
+        with ThreadPoolExecutor(max_workers=min(max(len(calls), 1), MAX_WORKERS)) as pool:
+            return await asyncio.gather(*(loop.run_in_executor(pool, self._call, func, args, node_id)
+                                          for func, args, node_id in calls),
+                                        return_exceptions=True)
+
+    def _call(self, func: Callable, args: tuple, node_id: Optional[str]):
+        with self.client.prefetching(self.limiter, node_id):
+            return func(*args)
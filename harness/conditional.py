@@ -0,0 +1,120 @@
+"""Модуль условных запросов: хранилище ответов с валидаторами ETag/Last-Modified между прогонами"""
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+import requests
+from harness.cassette import SKIPPED_HEADERS
+from harness.shared_cache import build_response
+
+DEFAULT_STORE_SIZE = 1024
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS validators (
+    key TEXT PRIMARY KEY,
+    stored REAL NOT NULL,
+    url TEXT NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    headers TEXT NOT NULL,
+    body BLOB NOT NULL,
+    wire_size INTEGER NOT NULL,
+    duration REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS validators_stored ON validators (stored);
+'''
+
+
+class StoredResponse:
+    """Класс сохраненного ответа с валидаторами для условного запроса"""
+
+    def __init__(self, key: str, url: str, etag: Optional[str], last_modified: Optional[str], headers: dict,
+                 body: bytes, wire_size: int, duration: float):
+        self.key = key
+        self.url = url
+        self.etag = etag
+        self.last_modified = last_modified
+        self.headers = headers
+        self.body = body
+        self.wire_size = wire_size
+        self.duration = duration
+
+    def conditional_headers(self) -> dict:
+        """Функция получения заголовков условного запроса"""
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+class ConditionalStore:
+    """Класс хранилища ответов 200 с заголовками ETag и/или Last-Modified в файле SQLite:
+    при следующем запросе сервер проверяет валидаторы и отвечает 304 без тела, если данные не изменились.
+    Хранится не больше maxsize последних ответов"""
+
+    def __init__(self, path: Path, maxsize: int = DEFAULT_STORE_SIZE):
+        self.path = Path(path)
+        self.maxsize = maxsize
+        self.revalidated = 0
+        self.not_modified = 0
+        self.saved_bytes = 0
+        self.saved_seconds = 0.0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+        with self._lock:
+            self._db.execute('PRAGMA journal_mode=WAL')
+            self._db.executescript(_SCHEMA)
+
+    def lookup(self, key: str) -> Optional[StoredResponse]:
+        """Функция поиска сохраненного ответа по ключу запроса"""
+        with self._lock:
+            row = self._db.execute('SELECT url, etag, last_modified, headers, body, wire_size, duration '
+                                   'FROM validators WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            return None
+        url, etag, last_modified, headers, body, wire_size, duration = row
+        return StoredResponse(key, url, etag, last_modified, json.loads(headers), body, wire_size, duration)
+
+    def update(self, key: str, response: requests.Response, duration: float,
+               stored: Optional[StoredResponse] = None) -> requests.Response:
+        """Функция обработки ответа на (условный) запрос: 304 заменяется сохраненным ответом,
+        новый ответ 200 с валидаторами сохраняется"""
+        if stored is not None:
+            with self._lock:
+                self.revalidated += 1
+        if response.status_code == 304 and stored is not None:
+            with self._lock:
+                self.not_modified += 1
+                self.saved_bytes += stored.wire_size
+                self.saved_seconds += max(0.0, stored.duration - duration)
+            full = build_response(response.request.method, stored.url, 200, stored.headers, stored.body)
+            full.elapsed = response.elapsed
+            return full
+
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if response.status_code == 200 and (etag or last_modified):
+            self._store(key, response, etag, last_modified, duration)
+        return response
+
+    def _store(self, key: str, response: requests.Response, etag: Optional[str], last_modified: Optional[str],
+               duration: float):
+        headers = {name: value for name, value in response.headers.items() if name.lower() not in SKIPPED_HEADERS}
+        body = response.content
+        wire_size = response.raw.tell() if hasattr(response.raw, 'tell') else len(body)
+        with self._lock:
+            self._db.execute('INSERT OR REPLACE INTO validators VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                             (key, time.time(), response.url, etag, last_modified, json.dumps(headers), body,
+                              wire_size, duration))
+            self._db.execute('DELETE FROM validators WHERE rowid IN '
+                             '(SELECT rowid FROM validators ORDER BY stored DESC LIMIT -1 OFFSET ?)',
+                             (self.maxsize,))
+
+    def close(self):
+        """Функция закрытия соединения с базой"""
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,242 @@
+"""Модуль общего HTTP-клиента с пулом соединений"""
+import threading
+from contextlib import contextmanager
+from typing import Optional
+import time
+import requests
+from urllib3.util.request import ACCEPT_ENCODING
+from urllib3.util.retry import Retry
+from harness.cache import (CACHE_SCOPES, DEFAULT_CACHE_SIZE, IDEMPOTENT_METHODS, ResponseCache, is_cacheable,
+                           memoize_json, request_key)
+from harness.cassette import MISS_HEADER, CassetteMiss
+from harness.ratelimit import DEFAULT_BURST, HostRateLimiter, RetryScheduler
+from harness.timing import TimedHTTPAdapter, TimingCollector
+
+DEFAULT_POOL_SIZE = 10
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF = 0.3
+DEFAULT_TIMEOUT = 30
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+# методы, которые безопасно повторять (POST не повторяется, как и в urllib3)
+RETRY_METHODS = Retry.DEFAULT_ALLOWED_METHODS
+
+
+class ApiClient:
+    """Класс HTTP-клиента: keep-alive пул соединений на каждый хост, адаптивное ограничение частоты
+    запросов к хосту (rate_limit запросов/сек, None - до первого 429), повторы со случайной
+    экспоненциальной задержкой, таймаут по умолчанию и мемоизация идемпотентных запросов
+    в области видимости cache_scope"""
+
+    def __init__(self,
+                 pool_size: int = DEFAULT_POOL_SIZE,
+                 retries: int = DEFAULT_RETRIES,
+                 backoff: float = DEFAULT_BACKOFF,
+                 timeout: float = DEFAULT_TIMEOUT,
+                 cache_scope: Optional[str] = None,
+                 cache_size: int = DEFAULT_CACHE_SIZE,
+                 rate_limit: Optional[float] = None,
+                 rate_burst: int = DEFAULT_BURST):
+        self.timeout = timeout
+        self.cache_scope = cache_scope
+        self.caches = {scope: ResponseCache(cache_size) for scope in CACHE_SCOPES}
+        self.recorder = None
+        self.replay = None
+        self.shared_cache = None
+        self.conditional = None
+        self.prefetched = {}
+        self.timings = TimingCollector()
+        self.node_id = None
+        self._local = threading.local()
+        self.rate_limiter = HostRateLimiter(rate_limit, rate_burst)
+        self.scheduler = RetryScheduler(retries, backoff)
+        self.session = requests.Session()
+        # gzip/deflate, а также br и zstd, если установлены brotli/zstandard
+        self.session.headers['Accept-Encoding'] = ACCEPT_ENCODING
+        # повторы выполняет сам клиент, чтобы учитывать ответы сервера в ограничении частоты
+        self.adapter = TimedHTTPAdapter(pool_connections=pool_size,
+                                        pool_maxsize=pool_size,
+                                        max_retries=0)
+        self.session.mount('http://', self.adapter)
+        self.session.mount('https://', self.adapter)
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """Функция отправки запроса через общий пул соединений
+        (повторный идемпотентный запрос отдается из предзагрузки или кэша текущей области видимости,
+        cache=False - ответ не берется из кэша и не сохраняется в него)"""
+        kwargs.setdefault('timeout', self.timeout)
+        cache_allowed = kwargs.pop('cache', True)
+        if not cache_allowed or method.upper() not in IDEMPOTENT_METHODS or kwargs.get('stream'):
+            return self._send(method, url, **kwargs)
+
+        key = request_key(method, url, kwargs.get('params'), kwargs.get('data'), kwargs.get('json'))
+        if getattr(self._local, 'limiter', None) is not None:
+            response = self._fetch(method, url, key, **kwargs)
+            if is_cacheable(method, response):
+                self.prefetched[key] = response
+            return response
+
+        cache = self.caches[self.cache_scope] if self.cache_scope is not None else None
+        response = cache.get(key) if cache is not None else None
+        if response is None:
+            response = self.prefetched.pop(key, None)
+        if response is None:
+            response = self._fetch(method, url, key, **kwargs)
+        if cache is not None and is_cacheable(method, response):
+            cache.put(key, response)
+        return response
+
+    def _fetch(self, method: str, url: str, key: str, **kwargs) -> requests.Response:
+        """Функция отправки идемпотентного запроса через общий для процессов кэш (если он подключен
+        и мемоизация не отключена)"""
+        if self.shared_cache is None or self.cache_scope is None:
+            return self._send(method, url, **kwargs)
+        return self.shared_cache.fetch(method, key, lambda: self._send(method, url, **kwargs))
+
+    def _send(self, method: str, url: str, **kwargs) -> requests.Response:
+        """Функция отправки запроса в сеть (или на локальный сервер воспроизведения кассеты)"""
+        limiter = getattr(self._local, 'limiter', None)
+        if limiter is not None:
+            with limiter.slot(url):
+                return self._send_conditional(method, url, **kwargs)
+        return self._send_conditional(method, url, **kwargs)
+
+    def _send_conditional(self, method: str, url: str, **kwargs) -> requests.Response:
+        """Функция отправки get запроса с валидаторами сохраненного ответа (If-None-Match/If-Modified-Since):
+        ответ 304 заменяется сохраненным телом"""
+        if self.conditional is None or method.upper() != 'GET' or kwargs.get('stream'):
+            return self._send_with_retries(method, url, **kwargs)
+
+        key = request_key(method, url, kwargs.get('params'), kwargs.get('data'), kwargs.get('json'))
+        stored = self.conditional.lookup(key)
+        if stored is not None:
+            kwargs['headers'] = {**(kwargs.get('headers') or {}), **stored.conditional_headers()}
+        started = time.perf_counter()
+        response = self._send_with_retries(method, url, **kwargs)
+        return self.conditional.update(key, response, time.perf_counter() - started, stored)
+
+    def _send_with_retries(self, method: str, url: str, **kwargs) -> requests.Response:
+        """Функция отправки запроса с ограничением частоты хоста и повторами при кодах 429/5xx
+        и ошибках соединения"""
+        retriable = method.upper() in RETRY_METHODS
+        attempt = 0
+        while True:
+            self.rate_limiter.acquire(url)
+            try:
+                response = self._send_direct(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                if not retriable or attempt >= self.scheduler.retries:
+                    raise
+            else:
+                self.rate_limiter.observe(url, response)
+                if not retriable or response.status_code not in RETRY_STATUSES or attempt >= self.scheduler.retries:
+                    return response
+                response.close()
+            self.rate_limiter.backoff(url, self.scheduler.delay(attempt))
+            attempt += 1
+
+    def _send_direct(self, method: str, url: str, **kwargs) -> requests.Response:
+        node_id = getattr(self._local, 'node_id', None) or self.node_id
+        timing = self.timings.begin(method, url, node_id)
+        response = None
+        try:
+            if self.replay is not None:
+                kwargs['allow_redirects'] = False
+                response = memoize_json(self.session.request(method, self.replay.rewrite(url), **kwargs))
+            else:
+                response = memoize_json(self.session.request(method, url, **kwargs))
+        finally:
+            self.timings.finish(timing, response, stream=kwargs.get('stream', False))
+        if self.replay is not None and MISS_HEADER in response.headers:
+            # ответ-заглушка на промах кассеты не должен засчитываться негативным проверкам как 404
+            raise CassetteMiss(f'Обмен не записан в кассету: {method} {url}', response=response)
+        if self.recorder is not None:
+            self.recorder.record(response)
+        return response
+
+    @contextmanager
+    def prefetching(self, limiter, node_id: Optional[str] = None):
+        """Контекстный менеджер режима предзагрузки в текущем потоке: идемпотентные запросы
+        отправляются с ограничением limiter и сохраняются до первого запроса из теста node_id"""
+        self._local.limiter = limiter
+        self._local.node_id = node_id
+        try:
+            yield
+        finally:
+            self._local.limiter = None
+            self._local.node_id = None
+
+    def clear_cache(self, scope: str):
+        """Функция очистки кэша ответов заданной области видимости"""
+        self.caches[scope].clear()
+
+    def cache_stats(self) -> dict:
+        """Функция подсчета попаданий и промахов кэша ответов по областям видимости"""
+        return {scope: (cache.hits, cache.misses) for scope, cache in self.caches.items()}
+
+    def throttle_stats(self) -> dict:
+        """Функция подсчета по каждому хосту: запросов, повторов, ответов 429, секунд ожидания
+        и текущего лимита частоты"""
+        return {host: (stats.requests, stats.retries, stats.throttled_responses, stats.throttled,
+                       self.rate_limiter.current_rate(host))
+                for host, stats in self.rate_limiter.stats.items()}
+
+    def connection_stats(self) -> dict:
+        """Функция подсчета открытых соединений и отправленных запросов по каждому хосту"""
+        stats = {}
+        pools = self.adapter.poolmanager.pools
+        for key in pools.keys():
+            pool = pools[key]
+            host = f'{pool.scheme}://{pool.host}'
+            connections, requests_sent = stats.get(host, (0, 0))
+            stats[host] = (connections + pool.num_connections, requests_sent + pool.num_requests)
+        return stats
+
+    def close(self):
+        """Функция закрытия всех соединений пула, общего кэша и хранилища условных запросов"""
+        self.session.close()
+        if self.shared_cache is not None:
+            self.shared_cache.close()
+        if self.conditional is not None:
+            self.conditional.close()
+
+
+_client: Optional[ApiClient] = None
+
+
+def get_client() -> ApiClient:
+    """Функция получения текущего клиента (создается с настройками по умолчанию при первом обращении)"""
+    global _client
+    if _client is None:
+        _client = ApiClient()
+    return _client
+
+
+def set_client(client: Optional[ApiClient]):
+    """Функция замены текущего клиента, через который работают функции-хелперы"""
+    global _client
+    _client = client
+
+
+def request(method: str, url: str, **kwargs) -> requests.Response:
+    """Функция отправки запроса текущим клиентом"""
+    return get_client().request(method, url, **kwargs)
+
+
+def get(url: str, **kwargs) -> requests.Response:
+    """Функция отправки get запроса текущим клиентом"""
+    return request('GET', url, **kwargs)
+
+
+def post(url: str, **kwargs) -> requests.Response:
+    """Функция отправки post запроса текущим клиентом"""
+    return request('POST', url, **kwargs)
+
+
+def put(url: str, **kwargs) -> requests.Response:
+    """Функция отправки put запроса текущим клиентом"""
+    return request('PUT', url, **kwargs)
+
+
+def head(url: str, **kwargs) -> requests.Response:
+    """Функция отправки head запроса текущим клиентом"""
+    return request('HEAD', url, **kwargs)
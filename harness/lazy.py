@@ -0,0 +1,64 @@
+"""Модуль ленивых параметров: значения, требующие сети, вычисляются при setup теста, а не при сборе"""
+import fcntl
+import json
+import threading
+from pathlib import Path
+from typing import Callable, Optional
+
+
+class LazyParam:
+    """Класс параметра, значение которого вычисляется функцией func(*args) перед запуском теста"""
+
+    def __init__(self, func: Callable, *args):
+        self.func = func
+        self.args = args
+
+    @property
+    def name(self) -> str:
+        """Уникальное имя параметра (для общего между воркерами хранилища значений)"""
+        args = ', '.join(repr(arg) for arg in self.args)
+        return f'{self.func.__module__}.{self.func.__qualname__}({args})'
+
+    def __repr__(self):
+        return f'lazy_param({self.name})'
+
+
+def lazy_param(func: Callable, *args) -> LazyParam:
+    """Функция объявления ленивого параметра для pytest.mark.parametrize"""
+    return LazyParam(func, *args)
+
+
+class LazyParamResolver:
+    """Класс вычисления ленивых параметров: каждый параметр вычисляется один раз за прогон,
+    при заданном store_path значения разделяются между процессами (воркерами xdist) через файл"""
+
+    def __init__(self, store_path: Optional[Path] = None, run_id: Optional[str] = None):
+        self.store_path = store_path
+        self.run_id = run_id
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def resolve(self, param: LazyParam):
+        """Функция получения значения ленивого параметра"""
+        with self._lock:
+            if param.name not in self._values:
+                self._values[param.name] = self._resolve_shared(param)
+            return self._values[param.name]
+
+    def _resolve_shared(self, param: LazyParam):
+        """Функция вычисления значения под файловой блокировкой общего хранилища"""
+        if self.store_path is None:
+            return param.func(*param.args)
+
+        with open(self.store_path.with_suffix('.lock'), 'w', encoding='utf-8') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                store = json.loads(self.store_path.read_text(encoding='utf-8')) if self.store_path.exists() else {}
+                if store.get('run_id') != self.run_id:
+                    store = {'run_id': self.run_id, 'values': {}}
+                if param.name not in store['values']:
+                    store['values'][param.name] = param.func(*param.args)
+                    self.store_path.write_text(json.dumps(store), encoding='utf-8')
+                return store['values'][param.name]
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
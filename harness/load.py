@@ -0,0 +1,128 @@
+"""Модуль нагрузочного режима: функции-хелперы запускаются как взвешенные сценарии"""
+import random
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+from harness.ratelimit import HostRateLimiter
+
+DEFAULT_CONCURRENCY = 10
+DEFAULT_DURATION = 10.0
+DEFAULT_RAMP_UP = 0.0
+
+
+def prepare_client(client):
+    """Функция настройки HTTP-клиента для нагрузки: каждый вызов сценария - один запрос до сервера
+    без мемоизации, условных запросов, повторов и подстройки частоты по ответам,
+    чтобы req/s и перцентили описывали эндпоинт, а не политику клиента.
+    Замеры отдельных запросов не сохраняются: за долгий прогон они заняли бы память без ограничения,
+    а задержки нагрузки и так собирает LoadRunner"""
+    client.cache_scope = None
+    client.node_id = None
+    client.timings.recording = False
+    client.conditional = None
+    client.scheduler.retries = 0
+    client.rate_limiter = HostRateLimiter(client.rate_limiter.rate, client.rate_limiter.burst, adaptive=False)
+
+
+class Scenario:
+    """Класс сценария нагрузки: вызов func(*args) с весом weight среди остальных сценариев.
+    Ответ с кодом, отличным от expected_status (по умолчанию - любой код 4xx/5xx), считается ошибкой"""
+
+    def __init__(self, name: str, func: Callable, *args, weight: int = 1, expected_status: Optional[int] = None):
+        self.name = name
+        self.func = func
+        self.args = args
+        self.weight = weight
+        self.expected_status = expected_status
+
+    def is_error(self, response) -> bool:
+        """Функция проверки, что ответ сценария является ошибкой"""
+        if self.expected_status is not None:
+            return response.status_code != self.expected_status
+        return response.status_code >= 400
+
+
+class EndpointStats:
+    """Класс накопленных результатов нагрузки на один сценарий"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.latencies = []
+        self.errors = 0
+
+    @property
+    def requests(self) -> int:
+        """Кол-во выполненных запросов"""
+        return len(self.latencies)
+
+    @property
+    def error_rate(self) -> float:
+        """Доля запросов с ошибкой"""
+        return self.errors / self.requests if self.requests else 0.0
+
+    def percentile(self, percent: int) -> float:
+        """Функция вычисления перцентиля задержки, сек"""
+        if not self.latencies:
+            return 0.0
+        if len(self.latencies) == 1:
+            return self.latencies[0]
+        return statistics.quantiles(self.latencies, n=100, method='inclusive')[percent - 1]
+
+
+class LoadRunner:
+    """Класс запуска сценариев в concurrency потоках в течение duration секунд,
+    потоки стартуют равномерно в течение ramp_up секунд"""
+
+    def __init__(self, scenarios: list, concurrency: int = DEFAULT_CONCURRENCY,
+                 duration: float = DEFAULT_DURATION, ramp_up: float = DEFAULT_RAMP_UP, seed: Optional[int] = None):
+        if not scenarios:
+            raise ValueError('Не задано ни одного сценария нагрузки')
+        self.scenarios = scenarios
+        self.concurrency = concurrency
+        self.duration = duration
+        self.ramp_up = ramp_up
+        self.seed = seed
+        self.stats = {scenario.name: EndpointStats(scenario.name) for scenario in scenarios}
+        self.elapsed = 0.0
+        self._lock = threading.Lock()
+
+    def run(self) -> dict:
+        """Функция запуска нагрузки, возвращает результаты по сценариям"""
+        started = time.perf_counter()
+        deadline = started + self.duration
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            for worker in range(self.concurrency):
+                delay = self.ramp_up * worker / self.concurrency
+                seed = None if self.seed is None else self.seed + worker
+                pool.submit(self._worker, started + delay, deadline, random.Random(seed))
+        self.elapsed = time.perf_counter() - started
+        return self.stats
+
+    def _worker(self, start_at: float, deadline: float, rng: random.Random):
+        weights = [scenario.weight for scenario in self.scenarios]
+        time.sleep(max(0.0, start_at - time.perf_counter()))
+        while time.perf_counter() < deadline:
+            scenario = rng.choices(self.scenarios, weights=weights)[0]
+            began = time.perf_counter()
+            try:
+                error = scenario.is_error(scenario.func(*scenario.args))
+            except Exception:
+                error = True
+            latency = time.perf_counter() - began
+            with self._lock:
+                stats = self.stats[scenario.name]
+                stats.latencies.append(latency)
+                stats.errors += error
+
+    def report(self) -> list:
+        """Функция формирования строк отчета: запросов/с, доля ошибок и p50/p95/p99 по сценариям"""
+        lines = [f'{"сценарий":<40} {"запросов":>8} {"req/s":>8} {"ошибок":>7} '
+                 f'{"p50, мс":>8} {"p95, мс":>8} {"p99, мс":>8}']
+        for stats in self.stats.values():
+            rps = stats.requests / self.elapsed if self.elapsed else 0.0
+            lines.append(f'{stats.name:<40} {stats.requests:>8} {rps:>8.1f} {stats.error_rate:>7.1%} '
+                         f'{stats.percentile(50) * 1000:>8.1f} {stats.percentile(95) * 1000:>8.1f} '
+                         f'{stats.percentile(99) * 1000:>8.1f}')
+        return lines
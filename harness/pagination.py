@@ -0,0 +1,40 @@
+"""Модуль ленивого постраничного обхода списков с фоновой предзагрузкой следующих страниц"""
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterator
+
+DEFAULT_PREFETCH = 4
+
+
+def paginate(fetch_page: Callable[[int], list], per_page: int, prefetch: int = DEFAULT_PREFETCH,
+             key: str = 'id', first_page: int = 1) -> Iterator:
+    """Функция-генератор записей всех страниц: fetch_page(page) возвращает список записей страницы.
+    Следующие prefetch страниц загружаются в фоне, обход заканчивается на неполной странице.
+    Записи, повторившиеся на соседних страницах (сдвиг при изменении данных), отбрасываются по полю key;
+    в памяти одновременно хранится не больше prefetch + 1 страниц"""
+    window = max(prefetch, 1)
+    with ThreadPoolExecutor(max_workers=window) as pool:
+        pending = deque(pool.submit(fetch_page, page) for page in range(first_page, first_page + window))
+        next_page = first_page + window
+        previous_keys = set()
+        try:
+            while pending:
+                records = pending.popleft().result()
+                last_page = len(records) < per_page
+                if not last_page:
+                    pending.append(pool.submit(fetch_page, next_page))
+                    next_page += 1
+
+                page_keys = set()
+                for record in records:
+                    record_key = record.get(key)
+                    if record_key in previous_keys or record_key in page_keys:
+                        continue
+                    page_keys.add(record_key)
+                    yield record
+                if last_page:
+                    return
+                previous_keys = page_keys
+        finally:
+            for future in pending:
+                future.cancel()
@@ -0,0 +1,205 @@
+"""Модуль адаптивного ограничения частоты запросов к хостам и планирования повторов"""
+import math
+import random
+import threading
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+from typing import Optional
+from urllib.parse import urlsplit
+
+DEFAULT_BURST = 10
+DEFAULT_MAX_BACKOFF = 30
+THROTTLE_STATUSES = (429, 503)
+# множитель снижения частоты при ответе 429 и прирост частоты (запросов/сек) после каждого успешного ответа
+RATE_DECREASE = 0.5
+RATE_INCREASE = 0.5
+MIN_RATE = 0.1
+# 429 на запросы, отправленные до предыдущего снижения, не снижают частоту повторно
+DECREASE_INTERVAL = 1.0
+# значения X-RateLimit-Reset больше этого - unix-время, а не кол-во секунд
+EPOCH_THRESHOLD = 10 ** 9
+REMAINING_HEADERS = ('RateLimit-Remaining', 'X-RateLimit-Remaining')
+RESET_HEADERS = ('RateLimit-Reset', 'X-RateLimit-Reset')
+
+
+def _header_number(headers, names: tuple) -> Optional[float]:
+    """Функция чтения числового значения первого найденного заголовка
+    (для списков политик вида '100, 100;w=60' берется первое число)"""
+    for name in names:
+        value = headers.get(name)
+        if value is not None:
+            try:
+                return float(value.split(',')[0].split(';')[0])
+            except ValueError:
+                return None
+    return None
+
+
+def retry_after(headers) -> Optional[float]:
+    """Функция разбора заголовка Retry-After (секунды или HTTP-дата) в кол-во секунд ожидания"""
+    value = headers.get('Retry-After')
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class HostStats:
+    """Класс статистики ограничения частоты одного хоста"""
+
+    def __init__(self):
+        self.requests = 0
+        self.retries = 0
+        self.throttled_responses = 0
+        self.throttled = 0.0
+
+
+class TokenBucket:
+    """Класс корзины токенов одного хоста: rate запросов/сек с запасом burst,
+    частота подстраивается под ответы сервера (math.inf - без ограничения до первого 429)"""
+
+    def __init__(self, rate: float = math.inf, burst: int = DEFAULT_BURST):
+        self.rate = rate
+        self.ceiling = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.decreased = -math.inf
+        self.recent = deque()
+        self.lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Функция резервирования токена, возвращает кол-во секунд ожидания до отправки"""
+        with self.lock:
+            now = time.monotonic()
+            self.recent.append(now)
+            while self.recent[0] < now - 1:
+                self.recent.popleft()
+            if math.isinf(self.rate):
+                return max(0.0, self.paused_until - now)
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+            return max(wait, self.paused_until - now)
+
+    def slow_down(self, pause: Optional[float]):
+        """Функция реакции на ответ 429: пауза до Retry-After и снижение частоты"""
+        with self.lock:
+            now = time.monotonic()
+            if pause is not None:
+                self.paused_until = max(self.paused_until, now + pause)
+            if now - self.decreased < DECREASE_INTERVAL:
+                return
+            self.decreased = now
+            current = self.rate if not math.isinf(self.rate) else len(self.recent)
+            self.rate = max(MIN_RATE, current * RATE_DECREASE)
+            self.tokens = min(self.tokens, 0.0)
+            self.updated = now
+
+    def speed_up(self):
+        """Функция постепенного возврата частоты к потолку после успешного ответа"""
+        with self.lock:
+            if not math.isinf(self.rate) and self.rate < self.ceiling:
+                self.rate = min(self.ceiling, self.rate + RATE_INCREASE)
+
+    def wait_for_quota(self, reset: float):
+        """Функция паузы до обновления исчерпанной квоты сервера через reset секунд"""
+        with self.lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + reset)
+
+
+class HostRateLimiter:
+    """Класс ограничения частоты запросов по хостам: корзина токенов на каждый хост,
+    частота снижается при ответах 429 и постепенно восстанавливается после успешных,
+    по заголовкам Retry-After и RateLimit-*/X-RateLimit-* (исчерпанная квота) хост ставится на паузу.
+    adaptive=False - частота постоянная, ответы сервера ее не меняют"""
+
+    def __init__(self, rate: Optional[float] = None, burst: int = DEFAULT_BURST, adaptive: bool = True):
+        self.rate = rate or math.inf
+        self.burst = burst
+        self.adaptive = adaptive
+        self.stats = {}
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def _host(self, url: str) -> tuple:
+        host = urlsplit(url).netloc
+        with self._lock:
+            if host not in self._buckets:
+                self._buckets[host] = TokenBucket(self.rate, self.burst)
+                self.stats[host] = HostStats()
+            return self._buckets[host], self.stats[host]
+
+    def acquire(self, url: str):
+        """Функция ожидания разрешения на отправку запроса к хосту url"""
+        bucket, stats = self._host(url)
+        wait = bucket.reserve()
+        with self._lock:
+            stats.requests += 1
+            stats.throttled += wait
+        if wait > 0:
+            time.sleep(wait)
+
+    def observe(self, url: str, response):
+        """Функция подстройки частоты хоста по коду и заголовкам ответа"""
+        if not self.adaptive:
+            return
+        bucket, stats = self._host(url)
+        if response.status_code in THROTTLE_STATUSES:
+            pause = retry_after(response.headers)
+            if response.status_code == 429 or pause is not None:
+                with self._lock:
+                    stats.throttled_responses += 1
+                bucket.slow_down(pause)
+                return
+
+        remaining = _header_number(response.headers, REMAINING_HEADERS)
+        reset = _header_number(response.headers, RESET_HEADERS)
+        if remaining is not None and remaining < 1 and reset is not None:
+            if reset > EPOCH_THRESHOLD:
+                reset -= time.time()
+            if reset > 0:
+                bucket.wait_for_quota(reset)
+                return
+        if response.status_code < 400:
+            bucket.speed_up()
+
+    def backoff(self, url: str, delay: float):
+        """Функция ожидания перед повтором запроса к хосту url"""
+        _, stats = self._host(url)
+        with self._lock:
+            stats.retries += 1
+            stats.throttled += delay
+        time.sleep(delay)
+
+    def current_rate(self, url_or_host: str) -> float:
+        """Функция получения текущей допустимой частоты запросов к хосту, запросов/сек"""
+        host = urlsplit(url_or_host).netloc or url_or_host
+        bucket = self._buckets.get(host)
+        return bucket.rate if bucket is not None else self.rate
+
+
+class RetryScheduler:
+    """Класс расписания повторов: экспоненциальная задержка backoff * 2^attempt (не больше max_backoff)
+    со случайным разбросом в ее второй половине, чтобы параллельные повторы не приходили одновременно"""
+
+    def __init__(self, retries: int, backoff: float, max_backoff: float = DEFAULT_MAX_BACKOFF,
+                 rng: Optional[random.Random] = None):
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.rng = rng or random.Random()
+
+    def delay(self, attempt: int) -> float:
+        """Функция вычисления задержки перед повтором номер attempt (с нуля), сек"""
+        ceiling = min(self.max_backoff, self.backoff * 2 ** attempt)
+        return self.rng.uniform(ceiling / 2, ceiling)
@@ -0,0 +1,34 @@
+"""Модуль проверки схемы списков записей в ответах одним вызовом pydantic"""
+from functools import lru_cache
+from typing import Type
+import requests
+from pydantic import BaseModel, TypeAdapter, ValidationError
+
+
+@lru_cache(maxsize=None)
+def list_adapter(model: Type[BaseModel]) -> TypeAdapter:
+    """Функция получения (один раз на модель) адаптера для списка записей модели"""
+    return TypeAdapter(list[model])
+
+
+def validate_list(response: requests.Response, model: Type[BaseModel]) -> list:
+    """Функция проверки всех записей списка в ответе моделью model напрямую из байтов тела ответа.
+    Возвращает список записей-моделей, при ошибках перечисляет индексы всех невалидных записей"""
+    try:
+        return list_adapter(model).validate_json(response.content)
+    except ValidationError as error:
+        raise _invalid_records(error, model) from error
+
+
+def validate_records(records: list, model: Type[BaseModel]) -> list:
+    """Функция проверки уже разобранного списка записей моделью model (например, вложенного в ответ)"""
+    try:
+        return list_adapter(model).validate_python(records)
+    except ValidationError as error:
+        raise _invalid_records(error, model) from error
+
+
+def _invalid_records(error: ValidationError, model: Type[BaseModel]) -> AssertionError:
+    """Функция формирования ошибки проверки с индексами всех невалидных записей"""
+    indexes = sorted({err['loc'][0] for err in error.errors() if err['loc'] and isinstance(err['loc'][0], int)})
+    return AssertionError(f'Записи не соответствуют модели {model.__name__}, индексы: {indexes}\n{error}')
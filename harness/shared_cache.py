@@ -0,0 +1,128 @@
+"""Модуль кэша ответов, общего для нескольких процессов (воркеров xdist), на базе SQLite"""
+import fcntl
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Optional
+import requests
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+from harness.cache import is_cacheable, memoize_json
+from harness.cassette import SKIPPED_HEADERS
+
+DEFAULT_SHARED_TTL = 600
+DEFAULT_SHARED_CACHE_SIZE = 4096
+LOCK_BUCKETS = 256
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS responses (
+    run_id TEXT NOT NULL,
+    key TEXT NOT NULL,
+    created REAL NOT NULL,
+    status INTEGER NOT NULL,
+    url TEXT NOT NULL,
+    headers TEXT NOT NULL,
+    body BLOB NOT NULL,
+    PRIMARY KEY (run_id, key)
+);
+CREATE INDEX IF NOT EXISTS responses_created ON responses (created);
+'''
+
+
+def build_response(method: str, url: str, status: int, headers: dict, body: bytes) -> requests.Response:
+    """Функция сборки ответа requests из сохраненных кода, заголовков и тела"""
+    response = requests.Response()
+    response.status_code = status
+    response.headers = CaseInsensitiveDict(headers)
+    response.encoding = get_encoding_from_headers(response.headers)
+    response.url = url
+    response.request = requests.Request(method, url).prepare()
+    response._content = body
+    return memoize_json(response)
+
+
+class SharedResponseCache:
+    """Класс кэша ответов в файле SQLite, общего для всех процессов прогона run_id:
+    запрос с одним ключом отправляется один раз (остальные процессы ждут его под файловой блокировкой),
+    записи старше ttl секунд не используются, хранится не больше maxsize самых свежих записей"""
+
+    def __init__(self, path: Path, run_id: str, ttl: float = DEFAULT_SHARED_TTL,
+                 maxsize: int = DEFAULT_SHARED_CACHE_SIZE):
+        self.path = Path(path)
+        self.run_id = run_id
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._lock_dir = self.path.with_suffix('.locks')
+        self._lock_dir.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+        with self._lock:
+            self._db.execute('PRAGMA journal_mode=WAL')
+            self._db.executescript(_SCHEMA)
+
+    def fetch(self, method: str, key: str, send: Callable[[], requests.Response]) -> requests.Response:
+        """Функция получения ответа по ключу запроса из общего кэша или вызовом send()
+        (ответ сохраняется, если его можно переиспользовать)"""
+        response = self._lookup(method, key)
+        if response is None:
+            with self._key_lock(key):
+                response = self._lookup(method, key)
+                if response is None:
+                    response = send()
+                    if is_cacheable(method, response):
+                        self._store(key, response)
+                    with self._lock:
+                        self.misses += 1
+                    return response
+        with self._lock:
+            self.hits += 1
+        return response
+
+    def _lookup(self, method: str, key: str) -> Optional[requests.Response]:
+        with self._lock:
+            row = self._db.execute('SELECT status, url, headers, body FROM responses '
+                                   'WHERE run_id = ? AND key = ? AND created >= ?',
+                                   (self.run_id, key, time.time() - self.ttl)).fetchone()
+        if row is None:
+            return None
+        status, url, headers, body = row
+        return build_response(method, url, status, json.loads(headers), body)
+
+    def _store(self, key: str, response: requests.Response):
+        headers = {name: value for name, value in response.headers.items() if name.lower() not in SKIPPED_HEADERS}
+        now = time.time()
+        with self._lock:
+            self._db.execute('INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)',
+                             (self.run_id, key, now, response.status_code, response.url, json.dumps(headers),
+                              response.content))
+            self._db.execute('DELETE FROM responses WHERE created < ?', (now - self.ttl,))
+            self._db.execute('DELETE FROM responses WHERE rowid IN '
+                             '(SELECT rowid FROM responses ORDER BY created DESC LIMIT -1 OFFSET ?)',
+                             (self.maxsize,))
+
+    @contextmanager
+    def _key_lock(self, key: str):
+        """Контекстный менеджер файловой блокировки ключа (ключи делятся на LOCK_BUCKETS файлов),
+        исключает одновременную отправку одного запроса разными процессами и потоками"""
+        bucket = int(hashlib.sha1(key.encode('utf-8')).hexdigest(), 16) % LOCK_BUCKETS
+        with open(self._lock_dir / f'{bucket:02x}.lock', 'w', encoding='utf-8') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute('SELECT COUNT(*) FROM responses WHERE run_id = ?', (self.run_id,)).fetchone()[0]
+
+    def close(self):
+        """Функция закрытия соединения с базой"""
+        with self._lock:
+            self._db.close()
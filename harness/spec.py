@@ -0,0 +1,212 @@
+"""Модуль декларативных спецификаций эндпоинтов (YAML/JSON): разбор в индекс кейсов и проверка ответов.
+
+Формат файла спецификации:
+
+    base_url: https://jsonplaceholder.typicode.com
+    endpoints:
+      - name: post_by_id
+        method: GET                      # по умолчанию GET
+        path: /posts/{post_id}           # шаблоны {param} заполняются параметрами кейса
+        query: {userId: '{user_id}'}     # query-параметры (необязательно)
+        params:                          # декартово произведение значений
+          post_id: {range: [1, 101]}     # или список значений
+        cases:                           # явные наборы параметров (вместе с params или вместо них)
+          - {post_id: 1}
+        status: 200                      # ожидаемый код, по умолчанию 200
+        model: test_jsonplaceholder_api:Post   # pydantic-модель (модуль:класс)
+        items: message                   # ключ списка записей в ответе, '' - весь ответ - список
+        length: 50                       # кол-во записей списка
+        expect: {id: '{post_id}'}        # значения полей ответа
+        each: {userId: '{user_id}'}      # значения полей каждой записи списка
+
+Значение-шаблон вида '{param}' заменяется значением параметра с сохранением типа.
+"""
+import hashlib
+import importlib
+import itertools
+import json
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+from urllib.parse import urlencode
+import requests
+import yaml
+from harness import http_client
+from harness.schema import validate_list, validate_records
+
+SPEC_SUFFIXES = ('.yaml', '.yml', '.json')
+# версия формата индекса: при изменении разбора индексы, сохраненные ранее, пересобираются
+INDEX_VERSION = 2
+ENDPOINT_FIELDS = frozenset({'name', 'method', 'base_url', 'path', 'query', 'params', 'cases', 'status', 'model',
+                             'items', 'length', 'expect', 'each'})
+_MISSING = object()
+
+# C-реализация загрузчика PyYAML (если собрана с libyaml) в разы быстрее
+YAML_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+
+class SpecError(ValueError):
+    """Класс ошибки в файле спецификации"""
+
+
+def _fill(template, params: dict):
+    """Функция подстановки параметров кейса в шаблон (рекурсивно для списков и словарей)"""
+    if isinstance(template, str):
+        if template.startswith('{') and template.endswith('}') and template[1:-1] in params:
+            return params[template[1:-1]]
+        return template.format(**params)
+    if isinstance(template, list):
+        return [_fill(value, params) for value in template]
+    if isinstance(template, dict):
+        return {key: _fill(value, params) for key, value in template.items()}
+    return template
+
+
+def _values(name: str, values) -> list:
+    """Функция раскрытия значений параметра: список или {range: [start, stop, step]}"""
+    if isinstance(values, dict) and set(values) == {'range'}:
+        return list(range(*values['range']))
+    if isinstance(values, list):
+        return values
+    raise SpecError(f'Параметр {name}: ожидается список значений или {{range: [start, stop]}}')
+
+
+def _case_params(endpoint: dict) -> list:
+    """Функция получения наборов параметров всех кейсов эндпоинта"""
+    params = endpoint.get('params') or {}
+    names = list(params)
+    cases = [dict(zip(names, combination))
+             for combination in itertools.product(*(_values(name, params[name]) for name in names))] if names else []
+    cases.extend(endpoint.get('cases') or [])
+    return cases or [{}]
+
+
+def compile_spec(data: dict, source: str = '<spec>') -> list:
+    """Функция разбора спецификации в индекс: список кейсов с готовыми url и ожидаемыми значениями"""
+    if not isinstance(data, dict) or not isinstance(data.get('endpoints'), list):
+        raise SpecError(f'{source}: ожидается словарь со списком endpoints')
+    index = []
+    for number, endpoint in enumerate(data['endpoints']):
+        name = endpoint.get('name') or f'endpoint{number}'
+        unknown = set(endpoint) - ENDPOINT_FIELDS
+        if unknown:
+            raise SpecError(f'{source}: {name}: неизвестные поля {sorted(unknown)}')
+        if 'path' not in endpoint:
+            raise SpecError(f'{source}: {name}: не задан path')
+        base_url = endpoint.get('base_url', data.get('base_url', '')).rstrip('/')
+        items = endpoint.get('items')
+        for params in _case_params(endpoint):
+            try:
+                url = base_url + _fill(endpoint['path'], params)
+                query = {key: value for key, value in _fill(endpoint.get('query') or {}, params).items()
+                         if value is not None}
+                if query:
+                    url = f'{url}{"&" if "?" in url else "?"}{urlencode(query, doseq=True)}'
+                case_id = ','.join(f'{key}={value}' for key, value in params.items())
+                index.append({'id': f'{name}[{case_id}]' if case_id else name,
+                              'endpoint': name,
+                              'method': endpoint.get('method', 'GET').upper(),
+                              'url': url,
+                              'status': int(endpoint.get('status', 200)),
+                              'model': endpoint.get('model'),
+                              'items': items,
+                              'length': _fill(endpoint.get('length'), params),
+                              'expect': _fill(endpoint.get('expect') or {}, params),
+                              'each': _fill(endpoint.get('each') or {}, params)})
+            except (KeyError, IndexError) as error:
+                raise SpecError(f'{source}: {name}: в шаблоне используется неизвестный параметр {error}') from error
+            except ValueError as error:
+                # незакрытая скобка в шаблоне ('/a/{b'), не число в status
+                raise SpecError(f'{source}: {name}: некорректный шаблон или значение: {error}') from error
+    return index
+
+
+def load_index(path: Path, cache_dir: Optional[Path] = None) -> list:
+    """Функция получения индекса кейсов файла спецификации: файл разбирается один раз,
+    индекс сохраняется в cache_dir и переиспользуется, пока файл не изменился"""
+    path = Path(path).resolve()
+    stat = path.stat()
+    return _load_index(path, stat.st_mtime_ns, stat.st_size, cache_dir)
+
+
+@lru_cache(maxsize=None)
+def _load_index(path: Path, mtime_ns: int, size: int, cache_dir: Optional[Path]) -> list:
+    version = f'{INDEX_VERSION}:{mtime_ns}:{size}'
+    index_path = None
+    if cache_dir is not None:
+        index_path = Path(cache_dir) / f'{hashlib.sha1(str(path).encode("utf-8")).hexdigest()}.json'
+        try:
+            cached = json.loads(index_path.read_text(encoding='utf-8'))
+            if cached.get('version') == version:
+                return cached['cases']
+        except (OSError, ValueError):
+            pass
+
+    with open(path, encoding='utf-8') as file:
+        data = json.load(file) if path.suffix == '.json' else yaml.load(file, Loader=YAML_LOADER)
+    cases = compile_spec(data, source=path.name)
+    if index_path is not None:
+        index_path.write_text(json.dumps({'version': version, 'cases': cases}, ensure_ascii=False),
+                              encoding='utf-8')
+    return cases
+
+
+@lru_cache(maxsize=None)
+def resolve_model(reference: str):
+    """Функция получения класса модели по ссылке вида 'модуль:Класс'"""
+    module_name, _, class_name = reference.partition(':')
+    try:
+        return getattr(importlib.import_module(module_name), class_name)
+    except (ImportError, AttributeError) as error:
+        raise SpecError(f'Модель {reference} не найдена') from error
+
+
+def _field(record, field: str):
+    """Функция получения поля записи по пути через точку ('address.city')"""
+    value = record
+    for part in field.split('.'):
+        if not isinstance(value, dict) or part not in value:
+            return _MISSING
+        value = value[part]
+    return value
+
+
+def send_case(case: dict) -> requests.Response:
+    """Функция отправки запроса кейса текущим клиентом"""
+    return http_client.request(case['method'], case['url'])
+
+
+def check_case(case: dict, response: requests.Response):
+    """Функция проверки ответа на запрос кейса: код, модель, кол-во записей и значения полей"""
+    assert response.status_code == case['status'], (f'Возвращается код, отличный от {case["status"]}: '
+                                                    f'{response.status_code}')
+    if not (case['model'] or case['expect'] or case['each'] or case['length'] is not None):
+        return
+
+    model = resolve_model(case['model']) if case['model'] else None
+    body = response.json()
+    for field, expected in case['expect'].items():
+        _check_field(_field(body, field), expected, f'Поле {field}')
+
+    if case['items'] is None and not case['each'] and case['length'] is None:
+        if model is not None:
+            model.model_validate_json(response.content)
+        return
+
+    records = body if not case['items'] else _field(body, case['items'])
+    assert isinstance(records, list), f'В ответе нет списка записей {case["items"] or ""}'.rstrip()
+    if model is not None:
+        if case['items']:
+            validate_records(records, model)
+        else:
+            validate_list(response, model)
+    if case['length'] is not None:
+        assert len(records) == int(case['length']), (f'Кол-во записей не равно заданному. '
+                                                     f'exp: {case["length"]}, fact: {len(records)}')
+    for position, record in enumerate(records):
+        for field, expected in case['each'].items():
+            _check_field(_field(record, field), expected, f'Запись {position}, поле {field}')
+
+
+def _check_field(actual, expected, title: str):
+    assert actual == expected, f'{title}: exp: {expected!r}, fact: {"нет поля" if actual is _MISSING else repr(actual)}'
@@ -0,0 +1,135 @@
+"""Модуль потоковой проверки больших JSON-массивов в ответах без загрузки всего тела в память"""
+import codecs
+import json
+from typing import Any, Callable, Iterator, Optional, Type
+import requests
+from pydantic import BaseModel, ValidationError
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+WHITESPACE = ' \t\r\n'
+NUMBER_CHARS = '0123456789.eE+-'
+
+_decoder = json.JSONDecoder()
+
+
+class _Reader:
+    """Класс буфера, который дочитывает тело ответа по мере разбора"""
+
+    def __init__(self, response: requests.Response, chunk_size: int):
+        self._chunks = response.iter_content(chunk_size=chunk_size)
+        self._text = codecs.getincrementaldecoder(response.encoding or 'utf-8')()
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+
+    def fill(self) -> bool:
+        """Функция дочитывания следующего куска тела (False, если тело закончилось)"""
+        if self.eof:
+            return False
+        self.buffer = self.buffer[self.pos:]
+        self.pos = 0
+        chunk = next(self._chunks, None)
+        if chunk is None:
+            self.eof = True
+            self.buffer += self._text.decode(b'', final=True)
+            return False
+        self.buffer += self._text.decode(chunk)
+        return True
+
+    def peek(self) -> str:
+        """Функция получения следующего значимого символа (пустая строка в конце тела)"""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer) or not self.fill():
+                return self.buffer[self.pos:self.pos + 1]
+
+    def expect(self, char: str):
+        """Функция проверки и пропуска ожидаемого символа"""
+        if self.peek() != char:
+            raise ValueError(f'Ожидался символ {char!r} в позиции {self.pos}, получен {self.peek()!r}')
+        self.pos += 1
+
+    def value(self) -> Any:
+        """Функция разбора следующего JSON-значения целиком"""
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if self.fill():
+                    continue
+                raise
+            # число в конце буфера может продолжаться в следующем куске
+            if self._may_continue(value, end) and self.fill():
+                continue
+            self.pos = end
+            return value
+
+    def _may_continue(self, value: Any, end: int) -> bool:
+        """Функция проверки, что разобранное значение может быть обрезано на границе куска"""
+        if end == len(self.buffer):
+            return True
+        return isinstance(value, (int, float)) and not isinstance(value, bool) and self.buffer[end] in NUMBER_CHARS
+
+
+def _seek_array(reader: _Reader, key: Optional[str]):
+    """Функция перехода к началу массива (корневого или в поле key корневого объекта)"""
+    if key is None:
+        reader.expect('[')
+        return
+    reader.expect('{')
+    while reader.peek() != '}':
+        name = reader.value()
+        reader.expect(':')
+        if name == key:
+            reader.expect('[')
+            return
+        reader.value()
+        if reader.peek() == ',':
+            reader.pos += 1
+    raise ValueError(f'В ответе нет поля {key!r}')
+
+
+def iter_json_array(response: requests.Response, key: Optional[str] = None,
+                    chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator:
+    """Функция-генератор элементов JSON-массива, разбираемых по мере чтения тела ответа
+    (массив в корне ответа или в поле key корневого объекта)"""
+    reader = _Reader(response, chunk_size)
+    _seek_array(reader, key)
+    if reader.peek() == ']':
+        return
+    while True:
+        yield reader.value()
+        separator = reader.peek()
+        if separator == ']':
+            return
+        reader.expect(',')
+
+
+def stream_validate(response: requests.Response,
+                    check: Optional[Callable[[Any], bool]] = None,
+                    model: Optional[Type[BaseModel]] = None,
+                    key: Optional[str] = None,
+                    limit: Optional[int] = None,
+                    message: str = 'Элемент не прошел проверку') -> int:
+    """Функция потоковой проверки элементов массива в ответе, открытом с stream=True:
+    каждый элемент проверяется моделью model и предикатом check,
+    проверка прерывается на первой ошибке или после limit элементов.
+    Возвращает кол-во проверенных элементов"""
+    count = 0
+    try:
+        for count, element in enumerate(iter_json_array(response, key=key), start=1):
+            if model is not None:
+                try:
+                    model.model_validate(element)
+                except ValidationError as error:
+                    raise AssertionError(f'Элемент [{count - 1}] не соответствует модели '
+                                         f'{model.__name__}: {error}') from error
+            if check is not None and not check(element):
+                raise AssertionError(f'{message}: [{count - 1}] {element!r}')
+            if limit is not None and count >= limit:
+                break
+    finally:
+        response.close()
+    return count
@@ -0,0 +1,220 @@
+"""Модуль измерения задержек запросов по фазам (DNS, connect, TLS, TTFB, передача тела)"""
+import csv
+import json
+import socket
+import threading
+import time
+from collections import defaultdict
+from typing import Optional
+from urllib.parse import urlsplit
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import ConnectTimeoutError, NewConnectionError
+from urllib3.util.connection import allowed_gai_family
+
+PHASES = ('dns', 'connect', 'tls', 'send', 'ttfb', 'transfer')
+REPORT_FIELDS = ('node_id', 'endpoint', 'url', 'status', 'size', 'wire_size', 'total') + PHASES
+
+_current = threading.local()
+
+
+class RequestTiming:
+    """Класс замера одного запроса: длительность фаз (сек), размер тела (после распаковки и переданный по сети)
+    и код ответа"""
+
+    def __init__(self, method: str, url: str, node_id: Optional[str]):
+        parts = urlsplit(url)
+        self.endpoint = f'{method} {parts.scheme}://{parts.netloc}{parts.path}'
+        self.url = url
+        self.node_id = node_id or '<collection>'
+        self.phases = dict.fromkeys(PHASES, 0.0)
+        self.total = 0.0
+        self.size = 0
+        self.wire_size = 0
+        self.status = None
+
+    def add(self, phase: str, seconds: float):
+        """Функция добавления длительности фазы"""
+        self.phases[phase] += seconds
+
+    def as_dict(self) -> dict:
+        """Функция представления замера в виде словаря для отчета"""
+        return {'node_id': self.node_id, 'endpoint': self.endpoint, 'url': self.url, 'status': self.status,
+                'size': self.size, 'wire_size': self.wire_size, 'total': self.total, **self.phases}
+
+
+def _record_phase(phase: str, seconds: float):
+    """Функция добавления фазы к замеру текущего запроса в потоке (если он идет)"""
+    timing = getattr(_current, 'timing', None)
+    if timing is not None:
+        timing.add(phase, seconds)
+
+
+class _TimedConnectionMixin:
+    """Примесь к соединениям urllib3, замеряющая фазы установки соединения и ожидания ответа"""
+    # суммарное время установки соединения: у HTTP-пулов оно идет внутри request() и вычитается из send
+    _connecting = 0.0
+
+    def _new_conn(self):
+        began = time.perf_counter()
+        try:
+            addresses = [info[4][0] for info in socket.getaddrinfo(self._dns_host, self.port, allowed_gai_family(),
+                                                                    socket.SOCK_STREAM)]
+        except socket.gaierror:
+            # ошибку разрешения имени сформирует сам urllib3
+            return super()._new_conn()
+        resolved = time.perf_counter()
+        _record_phase('dns', resolved - began)
+
+        dns_host = self._dns_host
+        try:
+            for address in addresses:
+                self._dns_host = address
+                try:
+                    sock = super()._new_conn()
+                    break
+                except (ConnectTimeoutError, NewConnectionError):
+                    # адрес недоступен или не ответил за connect timeout - пробуем следующий
+                    if address == addresses[-1]:
+                        raise
+        finally:
+            self._dns_host = dns_host
+        _record_phase('connect', time.perf_counter() - resolved)
+        return sock
+
+    def connect(self):
+        began = time.perf_counter()
+        try:
+            super().connect()
+        finally:
+            self._connecting += time.perf_counter() - began
+
+    def request(self, *args, **kwargs):
+        connecting = self._connecting
+        began = time.perf_counter()
+        result = super().request(*args, **kwargs)
+        _record_phase('send', max(0.0, time.perf_counter() - began - (self._connecting - connecting)))
+        return result
+
+    def getresponse(self, *args, **kwargs):
+        began = time.perf_counter()
+        response = super().getresponse(*args, **kwargs)
+        _record_phase('ttfb', time.perf_counter() - began)
+        return response
+
+
+class TimedHTTPConnection(_TimedConnectionMixin, HTTPConnection):
+    """Класс HTTP-соединения с замером фаз"""
+
+
+class TimedHTTPSConnection(_TimedConnectionMixin, HTTPSConnection):
+    """Класс HTTPS-соединения с замером фаз (TLS = установка соединения за вычетом DNS и TCP)"""
+
+    def connect(self):
+        timing = getattr(_current, 'timing', None)
+        if timing is None:
+            super().connect()
+            return
+        tcp_before = timing.phases['dns'] + timing.phases['connect']
+        began = time.perf_counter()
+        super().connect()
+        tcp = timing.phases['dns'] + timing.phases['connect'] - tcp_before
+        timing.add('tls', max(0.0, time.perf_counter() - began - tcp))
+
+
+class TimedHTTPConnectionPool(HTTPConnectionPool):
+    """Класс пула HTTP-соединений с замером фаз"""
+    ConnectionCls = TimedHTTPConnection
+
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    """Класс пула HTTPS-соединений с замером фаз"""
+    ConnectionCls = TimedHTTPSConnection
+
+
+class TimedHTTPAdapter(HTTPAdapter):
+    """Класс адаптера requests, пулы которого используют соединения с замером фаз"""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {'http': TimedHTTPConnectionPool,
+                                                   'https': TimedHTTPSConnectionPool}
+
+
+class TimingCollector:
+    """Класс накопления замеров запросов с группировкой по тестам
+    (recording=False - фазы замеряются, но замеры не сохраняются, например под нагрузкой)"""
+
+    def __init__(self):
+        self.recording = True
+        self.timings = []
+        self.by_node = defaultdict(list)
+        self._lock = threading.Lock()
+
+    def begin(self, method: str, url: str, node_id: Optional[str]) -> RequestTiming:
+        """Функция начала замера запроса в текущем потоке"""
+        timing = RequestTiming(method, url, node_id)
+        timing.total = time.perf_counter()
+        _current.timing = timing
+        return timing
+
+    def finish(self, timing: RequestTiming, response=None, stream: bool = False):
+        """Функция завершения замера: передача тела = общее время за вычетом остальных фаз
+        (для stream=True тело еще не прочитано, размер берется из Content-Length)"""
+        _current.timing = None
+        timing.total = time.perf_counter() - timing.total
+        if response is not None:
+            timing.status = response.status_code
+            if stream:
+                timing.size = timing.wire_size = int(response.headers.get('Content-Length') or 0)
+            else:
+                timing.size = len(response.content)
+                timing.wire_size = response.raw.tell() if hasattr(response.raw, 'tell') else timing.size
+        timing.phases['transfer'] = max(0.0, timing.total - sum(timing.phases.values()))
+        if not self.recording:
+            return
+        with self._lock:
+            self.timings.append(timing)
+            self.by_node[timing.node_id].append(timing)
+
+    def transfer_totals(self) -> tuple:
+        """Функция подсчета байт тел ответов: переданных по сети (со сжатием) и после распаковки"""
+        with self._lock:
+            return sum(timing.wire_size for timing in self.timings), sum(timing.size for timing in self.timings)
+
+    def slowest_endpoints(self, top: int = 10) -> list:
+        """Функция получения самых медленных эндпоинтов по средней длительности:
+        (endpoint, кол-во, среднее, максимум, средние по фазам)"""
+        grouped = defaultdict(list)
+        for timing in self.timings:
+            grouped[timing.endpoint].append(timing)
+        rows = []
+        for endpoint, timings in grouped.items():
+            mean = sum(timing.total for timing in timings) / len(timings)
+            phases = {phase: sum(timing.phases[phase] for timing in timings) / len(timings) for phase in PHASES}
+            rows.append((endpoint, len(timings), mean, max(timing.total for timing in timings), phases))
+        rows.sort(key=lambda row: row[2], reverse=True)
+        return rows[:top]
+
+    def histogram(self) -> dict:
+        """Функция построения гистограммы задержек по эндпоинтам (верхняя граница корзины в мс -> кол-во)"""
+        histogram = defaultdict(lambda: defaultdict(int))
+        for timing in self.timings:
+            bucket = 1
+            while bucket < timing.total * 1000:
+                bucket *= 2
+            histogram[timing.endpoint][bucket] += 1
+        return {endpoint: dict(sorted(buckets.items())) for endpoint, buckets in histogram.items()}
+
+    def write_report(self, path: str):
+        """Функция сохранения замеров в файл: .csv - по запросам, иначе JSON с запросами и гистограммой"""
+        records = [timing.as_dict() for timing in self.timings]
+        if path.endswith('.csv'):
+            with open(path, 'w', newline='', encoding='utf-8') as file:
+                writer = csv.DictWriter(file, fieldnames=REPORT_FIELDS)
+                writer.writeheader()
+                writer.writerows(records)
+            return
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump({'requests': records, 'histogram': self.histogram()}, file, ensure_ascii=False, indent=2)
@@ -1,14 +1,25 @@
 """Модуль реализации функции через pytest.addoption"""
-import requests
+import pytest
+from harness import http_client
 
+# коды, которыми сервер отвечает на неподдерживаемый HEAD
+HEAD_UNSUPPORTED = (405, 501)
 
-def test_req_addopt(pytestconfig):
+
+def probe_url(url, status_code, follow_redirects=True):
+    """Функция проверки url: сначала HEAD-запрос без тела ответа,
+    GET отправляется, только если код HEAD не совпал с ожидаемым или HEAD не поддерживается"""
+    response = http_client.head(url, allow_redirects=follow_redirects)
+    if response.status_code != status_code or response.status_code in HEAD_UNSUPPORTED:
+        response = http_client.get(url, allow_redirects=follow_redirects)
+    return response
+
+
+@pytest.mark.api_concurrent(prefetch=probe_url)
+def test_req_addopt(url, status_code, follow_redirects):
     """
-    Проверка, что при get-запросе url, введенного через командную строку в параметре --url,
+    Проверка, что при запросе url, введенного через командную строку в параметре --url (или в файле --url-file),
     возвращается код, идентичный коду, введенному через командную строку в параметре --status_code
     """
-    url = pytestconfig.getoption("--url")
-    status_code = int(pytestconfig.getoption("--status_code"))
-
-    assert requests.get(url).status_code == status_code, ('Возвращенный статус код не соответствует заданному в '
-                                                          'параметре --status_code')
+    assert probe_url(url, status_code, follow_redirects).status_code == status_code, (
+        'Возвращенный статус код не соответствует заданному в параметре --status_code')
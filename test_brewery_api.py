@@ -1,11 +1,17 @@
 """Модуль проверок Brewery API"""
-import json
 import random
 import string
 from typing import Optional
-import requests
 import pytest
 from pydantic import BaseModel
+from harness import http_client
+from harness.lazy import lazy_param
+from harness.load import Scenario
+from harness.pagination import DEFAULT_PREFETCH, paginate
+from harness.schema import validate_list
+
+ID_ALPHABET = string.ascii_letters + string.digits
+INVALID_ID_SEED = 'brewery-invalid-id'
 
 
 class Brewery(BaseModel):
@@ -31,31 +37,71 @@ class Brewery(BaseModel):
 def get_random_brewery_id():
     """Функция для получения рандомного id пивоварни"""
     url = 'https://api.openbrewerydb.org/v1/breweries/random'
-    response = requests.get(url)
+    response = http_client.get(url)
     random_id = response.json()[0]['id']
     return random_id
 
 
+def make_invalid_brewery_id(rng) -> str:
+    """Функция составления не валидного id пивоварни в формате валидного (8-4-4-4-12 символов)"""
+    return '-'.join(''.join(rng.choices(ID_ALPHABET, k=size)) for size in (8, 4, 4, 4, 12))
+
+
+def get_invalid_brewery_id():
+    """Функция для получения рандомного не валидного id пивоварни: при записи и воспроизведении кассеты
+    id не случайный, чтобы запрос совпадал с записанным"""
+    client = http_client.get_client()
+    if client.recorder is not None or client.replay is not None:
+        return make_invalid_brewery_id(random.Random(INVALID_ID_SEED))
+    return make_invalid_brewery_id(random)
+
+
 def get_brewery_by_id(br_id: str):
     """Функция для получения записи о пивоварне пo id"""
     url = f'https://api.openbrewerydb.org/v1/breweries/{br_id}'
-    return requests.get(url)
+    return http_client.get(url)
 
 
 def get_brewery_by_type(br_type: str):
     """Функция для получения списка пивоварен пo типу"""
     url = f'https://api.openbrewerydb.org/v1/breweries?by_type={br_type}'
-    return requests.get(url)
+    return http_client.get(url)
 
 
 def get_n_breweries_on_page(num: str):
     """Функция для получения списка пивоварен с кол-вом n на странице"""
     url = f'https://api.openbrewerydb.org/v1/breweries?per_page={num}'
-    return requests.get(url)
+    return http_client.get(url)
+
+
+def get_breweries_page(page: int, per_page: int = 200, br_type: Optional[str] = None):
+    """Функция для получения страницы списка пивоварен (с фильтром по типу)"""
+    url = f'https://api.openbrewerydb.org/v1/breweries?per_page={per_page}&page={page}'
+    if br_type is not None:
+        url += f'&by_type={br_type}'
+    # страницы не кэшируются, чтобы обход всего списка не держал их в памяти
+    return http_client.get(url, cache=False)
+
+
+def iter_breweries(br_type: Optional[str] = None, per_page: int = 200, prefetch: int = DEFAULT_PREFETCH):
+    """Функция-генератор всех пивоварен (с фильтром по типу) с фоновой загрузкой следующих страниц"""
+    def fetch_page(page):
+        response = get_breweries_page(page, per_page, br_type)
+        assert response.status_code == 200, (f'Страница {page}: возвращается код, отличный от 200: '
+                                             f'{response.status_code}')
+        return response.json()
+
+    return paginate(fetch_page, per_page, prefetch=prefetch)
+
+
+LOAD_SCENARIOS = [
+    Scenario('brewery: пивоварни по типу', get_brewery_by_type, 'micro', weight=3),
+    Scenario('brewery: 50 пивоварен на странице', get_n_breweries_on_page, '50'),
+]
 
 
 @pytest.mark.parametrize('br_id',
-                         [get_random_brewery_id()],
+                         [lazy_param(get_random_brewery_id)],
                          ids=['random valid id'])
 def test_get_brewery_by_id_posit(br_id):
     """Позитивные проверки получения пивоварни по id
@@ -67,11 +113,7 @@ def test_get_brewery_by_id_posit(br_id):
 
 
 @pytest.mark.parametrize('br_id',
-                         [f'{random.choices(string.ascii_letters + string.digits, k=8)}-'
-                          f'{random.choices(string.ascii_letters + string.digits, k=4)}-'
-                          f'{random.choices(string.ascii_letters + string.digits, k=4)}-'
-                          f'{random.choices(string.ascii_letters + string.digits, k=4)}-'
-                          f'{random.choices(string.ascii_letters + string.digits, k=12)}'],
+                         [lazy_param(get_invalid_brewery_id)],
                          ids=['random invalid id'])
 def test_get_brewery_by_id_negot(br_id):
     """Негативные проверки получения пивоварни по рандомному не валидному id,
@@ -80,6 +122,7 @@ def test_get_brewery_by_id_negot(br_id):
     assert response.status_code == 404, f'Возвращается код, отличный от 404: {response.status_code}'
 
 
+@pytest.mark.api_concurrent(prefetch=get_brewery_by_type)
 @pytest.mark.parametrize('br_type',
                          ['micro',
                           'nano',
@@ -107,10 +150,10 @@ def test_get_brewery_by_type_posit(br_type):
     response = get_brewery_by_type(br_type)
     assert response.status_code == 200, f'Возвращается код, отличный от 200: {response.status_code}'
 
-    Brewery.model_validate_json(json.dumps(response.json()[0]))
-    for brew in response.json():
-        assert brew['brewery_type'] == br_type, (f'Тип пивоварни не соответствует заданному, '
-                                                 f'exp: {br_type}, fact: {brew["brewery_type"]}')
+    breweries = validate_list(response, Brewery)
+    for brew in breweries:
+        assert brew.brewery_type == br_type, (f'Тип пивоварни не соответствует заданному, '
+                                              f'exp: {br_type}, fact: {brew.brewery_type}')
 
 
 @pytest.mark.parametrize('br_type',
@@ -130,8 +173,9 @@ def test_get_num_of_brew_per_page_posit(num):
     response = get_n_breweries_on_page(num)
     assert response.status_code == 200, f'Возвращается код, отличный от 200: {response.status_code}'
 
-    assert len(response.json()) == int(num), (f'Кол-во пивоварен на странице не равно заданному кол-ву. '
-                                              f'exp: {num}, fact: {len(response.json())}')
+    count = len(validate_list(response, Brewery))
+    assert count == int(num), (f'Кол-во пивоварен на странице не равно заданному кол-ву. '
+                               f'exp: {num}, fact: {count}')
 
 
 @pytest.mark.parametrize('num',
@@ -142,8 +186,9 @@ def test_get_default_num_of_brew_per_page_posit(num):
     response = get_n_breweries_on_page(num)
     assert response.status_code == 200, f'Возвращается код, отличный от 200: {response.status_code}'
 
-    assert len(response.json()) == 50, (f'Кол-во пивоварен на странице не равно дефолтному. '
-                                        f'exp: 50, fact: {len(response.json())}')
+    count = len(validate_list(response, Brewery))
+    assert count == 50, (f'Кол-во пивоварен на странице не равно дефолтному. '
+                         f'exp: 50, fact: {count}')
 
 
 @pytest.mark.parametrize('num',
@@ -154,5 +199,19 @@ def test_get_num_of_brew_per_page_negot(num):
     response = get_n_breweries_on_page(num)
     assert response.status_code == 200, f'Возвращается код, отличный от 200: {response.status_code}'
 
-    assert len(response.json()) == 200, (f'Кол-во пивоварен на странице не равно максимальному кол-ву. '
-                                         f'exp: 200, fact: {len(response.json())}')
+    count = len(validate_list(response, Brewery))
+    assert count == 200, (f'Кол-во пивоварен на странице не равно максимальному кол-ву. '
+                          f'exp: 200, fact: {count}')
+
+
+@pytest.mark.parametrize('br_type',
+                         ['nano', 'large'],
+                         ids=['nano', 'large'])
+def test_iter_all_breweries_by_type_posit(br_type):
+    """Позитивные проверки обхода всех страниц списка пивоварен по типу"""
+    count = 0
+    for brew in iter_breweries(br_type):
+        count += 1
+        assert brew['brewery_type'] == br_type, (f'Тип пивоварни не соответствует заданному, '
+                                                 f'exp: {br_type}, fact: {brew["brewery_type"]}')
+    assert count > 0, 'Не получено ни одной пивоварни заданного типа'
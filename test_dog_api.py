@@ -1,41 +1,44 @@
 """Модуль проверок DOG API"""
-import requests
 import pytest
+from harness import http_client
+from harness.load import Scenario
+from harness.streaming import stream_validate
 
 LIST_ALL_BREEDS = 'https://dog.ceo/api/breeds/list/all'
 
 
 def send_request_no_params(url):
     """Функция отправки get запроса без параметров"""
-    return requests.get(url)
+    return http_client.get(url)
 
 
-def send_request_all_breed_imgs(breed):
+def send_request_all_breed_imgs(breed, stream=False):
     """
     Функция отправки запроса всех фото породы
+    (stream=True - тело ответа не загружается сразу, для потоковой проверки)
     """
-    return requests.get(f'https://dog.ceo/api/breed/{breed}/images')
+    return http_client.get(f'https://dog.ceo/api/breed/{breed}/images', stream=stream)
 
 
 def send_request_rand_breed_imgs(breed):
     """
     Функция отправки запроса одной рандомной фото породы
     """
-    return requests.get(f'https://dog.ceo/api/breed/{breed}/images/random')
+    return http_client.get(f'https://dog.ceo/api/breed/{breed}/images/random')
 
 
 def send_request_num_of_breed_imgs(breed, random):
     """
     Функция отправки запроса заданного кол-ва рандомных фото породы
     """
-    return requests.get(f'https://dog.ceo/api/breed/{breed}/images/random/{random}')
+    return http_client.get(f'https://dog.ceo/api/breed/{breed}/images/random/{random}')
 
 
 def send_request_all_sub_breed_imgs(breed, sub_breed):
     """
         Функция отправки запроса на все фото под-породы
     """
-    return requests.get(f'https://dog.ceo/api/breed/{breed}/{sub_breed}/images')
+    return http_client.get(f'https://dog.ceo/api/breed/{breed}/{sub_breed}/images')
 
 
 def send_request_num_of_sub_breed_imgs(breed, sub_breed, random):
@@ -43,14 +46,21 @@ def send_request_num_of_sub_breed_imgs(breed, sub_breed, random):
         Функция отправки запроса заданного кол-ва рандомных фото под-породы
     """
 
-    return requests.get(f'https://dog.ceo/api/breed/{breed}/{sub_breed}/images/{random}')
+    return http_client.get(f'https://dog.ceo/api/breed/{breed}/{sub_breed}/images/{random}')
 
 
 def send_request_rand_sub_breed_imgs(breed, sub_breed):
     """
         Функция отправки запроса заданного кол-ва рандомных фото под-породы
     """
-    return requests.get(f'https://dog.ceo/api/breed/{breed}/{sub_breed}/images/random')
+    return http_client.get(f'https://dog.ceo/api/breed/{breed}/{sub_breed}/images/random')
+
+
+LOAD_SCENARIOS = [
+    Scenario('dog: список всех пород', send_request_no_params, LIST_ALL_BREEDS),
+    Scenario('dog: рандомное фото породы', send_request_rand_breed_imgs, 'hound', weight=3),
+    Scenario('dog: все фото породы', send_request_all_breed_imgs, 'bulldog'),
+]
 
 
 def test_list_all_breeds():
@@ -60,6 +70,7 @@ def test_list_all_breeds():
                                                                                    'значение, отличное от "success"')
 
 
+@pytest.mark.api_concurrent(prefetch=send_request_rand_breed_imgs)
 @pytest.mark.parametrize('breeds',
                          ['bulldog',
                           'greyhound',
@@ -93,10 +104,11 @@ def test_get_single_breed_img_posit(breeds):
                          ])
 def test_get_all_breed_images_posit(breeds):
     """Позитивные проверки получения всех фото породы"""
-    assert send_request_all_breed_imgs(breeds).status_code == 200, 'Возвращается код, отличный от 200'
-    # проверяем, что в url есть название запрошенной породы
-    for i in send_request_all_breed_imgs(breeds).json()['message']:
-        assert i.find(breeds) != -1, 'В url фото нет упоминания запрошенной породы'
+    with send_request_all_breed_imgs(breeds, stream=True) as response:
+        assert response.status_code == 200, 'Возвращается код, отличный от 200'
+        # проверяем, что в url есть название запрошенной породы (массив разбирается по мере чтения ответа)
+        stream_validate(response, key='message', check=lambda url: url.find(breeds) != -1,
+                        message='В url фото нет упоминания запрошенной породы')
 
 
 @pytest.mark.parametrize('breeds',
@@ -107,6 +119,7 @@ def test_get_all_breed_images_negot(breeds):
     assert send_request_all_breed_imgs(breeds).status_code == 404, 'Возвращается код, отличный от 404'
 
 
+@pytest.mark.api_concurrent(prefetch=lambda breeds: send_request_all_sub_breed_imgs(*breeds))
 @pytest.mark.parametrize('breeds',
                          [('hound', 'afghan'),
                           ('mastiff', 'bull'),
@@ -126,6 +139,7 @@ def test_get_all_sub_breed_images_posit(breeds):
                                                           'и под-породы')
 
 
+@pytest.mark.api_concurrent(prefetch=lambda num: send_request_num_of_breed_imgs('bulldog', random=num))
 @pytest.mark.parametrize('num',
                          [3, 10, 100],
                          ids=['2', '10', '100'])
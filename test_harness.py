@@ -0,0 +1,454 @@
+"""Модуль офлайн-проверок тестовой инфраструктуры harness (без обращения к внешним API)"""
+import io
+import json
+import subprocess
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from types import SimpleNamespace
+import pytest
+import requests
+from conftest import (_conditional_store, api_client_key, pytest_runtest_teardown, pytest_sessionfinish,
+                      pytest_testnodedown, shared_cache_stats_key)
+from harness.cassette import Cassette, CassetteMiss, ReplayServer
+from harness.http_client import ApiClient
+from harness.load import LoadRunner, Scenario, prepare_client
+from harness.pagination import paginate
+from harness.ratelimit import DECREASE_INTERVAL, RATE_DECREASE, RATE_INCREASE, TokenBucket
+from harness.shared_cache import SharedResponseCache
+from harness.spec import SpecError, compile_spec
+from harness.streaming import iter_json_array, stream_validate
+
+# строки с разделителями JSON и экранированием, многобайтовые символы и числа на границах кусков
+STREAM_BODY = json.dumps({
+    'status': 'success',
+    'skipped': [1, {'text': '"], {"message": ['}, [[], {}], None],
+    'message': [
+        'https://images.dog.ceo/breeds/hound-afghan/n02088094_1003.jpg',
+        'Собака 🐕 "в кавычках" \\ и ]},[',
+        -12.5e-3, 1234567890, 0, 3.0, True, False, None,
+        {'id': 1, 'tags': ['a', 'b'], 'nested': {'deep': [1, [2, [3]]]}},
+        [], {}, '',
+    ],
+    'tail': 42,
+}, ensure_ascii=False).encode('utf-8')
+
+
+def _stream_response(body: bytes) -> requests.Response:
+    """Функция сборки ответа, тело которого читается потоком из памяти"""
+    response = requests.Response()
+    response.status_code = 200
+    response.encoding = 'utf-8'
+    response.raw = io.BytesIO(body)
+    return response
+
+
+@pytest.mark.parametrize('chunk_size', range(1, 65))
+def test_iter_json_array_chunk_boundaries(chunk_size):
+    """Проверка потокового разбора массива при любых границах кусков тела"""
+    expected = json.loads(STREAM_BODY)['message']
+    assert list(iter_json_array(_stream_response(STREAM_BODY), key='message', chunk_size=chunk_size)) == expected
+
+    root = json.dumps(expected, ensure_ascii=False).encode('utf-8')
+    assert list(iter_json_array(_stream_response(root), chunk_size=chunk_size)) == expected
+
+
+def test_iter_json_array_missing_key():
+    """Проверка ошибки, если в ответе нет поля с массивом"""
+    with pytest.raises(ValueError, match='нет поля'):
+        list(iter_json_array(_stream_response(b'{"status": "error", "code": 404}'), key='message', chunk_size=3))
+
+
+def test_stream_validate_stops_on_first_error():
+    """Проверка прерывания потоковой проверки на первом не прошедшем элементе"""
+    body = json.dumps({'message': ['hound-1', 'hound-2', 'pug-3', 'hound-4']}).encode('utf-8')
+    with pytest.raises(AssertionError, match=r"\[2\] 'pug-3'"):
+        stream_validate(_stream_response(body), key='message', check=lambda url: 'hound' in url)
+    assert stream_validate(_stream_response(body), key='message', limit=2) == 2
+
+
+def test_paginate_skips_repeated_records():
+    """Проверка обхода страниц: записи, повторившиеся на границе страниц и внутри страницы, отбрасываются,
+    после неполной страницы загружаются только страницы, уже запрошенные в окне предзагрузки"""
+    pages = {1: [1, 2, 3], 2: [3, 4, 4], 3: [5, 6, 7], 4: [7, 8]}
+    fetched = []
+
+    def fetch_page(page):
+        fetched.append(page)
+        return [{'id': record_id} for record_id in pages.get(page, [])]
+
+    records = []
+    for record in paginate(fetch_page, per_page=3, prefetch=2):
+        records.append(record)
+        # пока тест разбирает записи, лишняя загрузка успела бы начаться в фоне
+        time.sleep(0.01)
+    assert [record['id'] for record in records] == [1, 2, 3, 4, 5, 6, 7, 8]
+    # неполная страница 4: запрошена еще только страница 5 из окна, дальше обход не идет
+    assert sorted(fetched) == [1, 2, 3, 4, 5]
+
+
+def test_paginate_close_stops_read_ahead():
+    """Проверка, что закрытие генератора до конца обхода отменяет еще не начатые загрузки и не запрашивает новые"""
+    fetched = []
+
+    def fetch_page(page):
+        fetched.append(page)
+        time.sleep(0.05)
+        return [{'id': (page, position)} for position in range(2)]
+
+    records = paginate(fetch_page, per_page=2, prefetch=2)
+    assert next(records) == {'id': (1, 0)}
+    records.close()
+    requested = sorted(fetched)
+    time.sleep(0.1)
+    # страница 3 запрошена в окне после первой, но могла быть отменена до начала загрузки
+    assert requested in ([1, 2], [1, 2, 3])
+    assert sorted(fetched) == requested, 'После закрытия генератора загружаются новые страницы'
+
+
+class _ScriptedHandler(BaseHTTPRequestHandler):
+    """Класс обработчика локального сервера: отвечает по очереди ответами из server.script
+    (код, заголовки), когда очередь пуста - server.default; тело - JSON {"n": номер запроса, "path": путь},
+    ответ отправляется через server.delay секунд"""
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def _respond(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        if length:
+            self.rfile.read(length)
+        time.sleep(self.server.delay)
+        with self.server.lock:
+            self.server.arrivals.append(time.monotonic())
+            self.server.received.append((self.command, self.path))
+            number = len(self.server.received)
+            status, headers = self.server.script.pop(0) if self.server.script else self.server.default
+        body = json.dumps({'n': number, 'path': self.path}).encode('utf-8')
+        self.send_response(status)
+        for name, value in {'Content-Type': 'application/json', **headers}.items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(body)
+
+    do_GET = do_HEAD = do_POST = do_PUT = _respond
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def local_server():
+    """Фикстура локального сервера с заданной очередью ответов (429, Retry-After, квоты)
+    и журналом полученных запросов"""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _ScriptedHandler)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    server.script = []
+    server.default = (200, {})
+    server.delay = 0.0
+    server.arrivals = []
+    server.received = []
+    server.base_url = f'http://127.0.0.1:{server.server_address[1]}'
+    server.url = f'{server.base_url}/limited'
+    thread = threading.Thread(target=server.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.mark.parametrize('scope', ['test', 'module', 'session'])
+def test_response_cache_sends_repeated_get_once(local_server, scope):
+    """Проверка мемоизации: повторный GET в области видимости отдается из кэша, после ее очистки - отправляется"""
+    client = ApiClient(cache_scope=scope)
+    first = client.request('GET', f'{local_server.base_url}/items?page=1')
+    assert client.request('GET', f'{local_server.base_url}/items?page=1') is first
+    assert len(local_server.received) == 1
+    client.clear_cache(scope)
+    client.request('GET', f'{local_server.base_url}/items?page=1')
+    assert len(local_server.received) == 2
+    client.close()
+
+
+@pytest.mark.parametrize('method', ['POST', 'PUT'])
+def test_response_cache_never_stores_post_put(local_server, method):
+    """Проверка, что POST и PUT отправляются каждый раз и не попадают в кэш"""
+    client = ApiClient(cache_scope='session')
+    for _ in range(3):
+        assert client.request(method, f'{local_server.base_url}/items', json={'id': 1}).status_code == 200
+    assert local_server.received == [(method, '/items')] * 3
+    assert all(len(cache) == 0 for cache in client.caches.values())
+    client.close()
+
+
+def test_response_cache_lru_eviction(local_server):
+    """Проверка вытеснения давно не использованного ответа при переполнении кэша cache_size"""
+    client = ApiClient(cache_scope='test', cache_size=2)
+    for path in ('/a', '/b', '/a', '/c', '/a', '/b'):
+        client.request('GET', f'{local_server.base_url}{path}')
+    # /a используется чаще всего и остается в кэше, /b вытесняется записью /c
+    assert [path for _, path in local_server.received] == ['/a', '/b', '/c', '/b']
+    assert len(client.caches['test']) == 2
+    client.close()
+
+
+def test_response_json_parsed_once(local_server, monkeypatch):
+    """Проверка однократного разбора JSON ответа, в том числе отданного из кэша"""
+    calls = []
+    parse = requests.Response.json
+    monkeypatch.setattr(requests.Response, 'json', lambda self, **kwargs: calls.append(1) or parse(self, **kwargs))
+    client = ApiClient(cache_scope='test')
+    body = client.request('GET', f'{local_server.base_url}/items').json()
+    assert client.request('GET', f'{local_server.base_url}/items').json() is body
+    assert body == {'n': 1, 'path': '/items'}
+    assert len(calls) == 1
+    client.close()
+
+
+def test_cassette_record_and_replay(local_server, tmp_path):
+    """Проверка записи обменов в кассету, сохранения, загрузки и воспроизведения без обращения к серверу"""
+    recording = ApiClient()
+    recording.recorder = Cassette()
+    recorded = [recording.request('GET', f'{local_server.base_url}/items?page=2'),
+                recording.request('POST', f'{local_server.base_url}/items', json={'id': 1})]
+    recording.recorder.save(tmp_path / 'cassette.json.gz')
+    recording.close()
+
+    replaying = ApiClient()
+    replaying.replay = ReplayServer(Cassette.load(tmp_path / 'cassette.json.gz')).start()
+    try:
+        replayed = [replaying.request('GET', f'{local_server.base_url}/items?page=2'),
+                    replaying.request('POST', f'{local_server.base_url}/items', json={'id': 1})]
+        assert [(response.status_code, response.json()) for response in replayed] == \
+            [(response.status_code, response.json()) for response in recorded]
+        assert len(local_server.received) == 2, 'При воспроизведении запрос дошел до сервера'
+
+        with pytest.raises(CassetteMiss, match='не записан в кассету'):
+            replaying.request('GET', f'{local_server.base_url}/items?page=3')
+        assert (replaying.replay.hits, replaying.replay.misses) == (2, 1)
+    finally:
+        replaying.replay.stop()
+        replaying.close()
+
+
+def test_cassette_merges_worker_exchanges():
+    """Проверка добавления обменов, записанных воркерами xdist, в кассету основного процесса"""
+    client = ApiClient()
+    client.recorder = Cassette()
+    client.recorder.add('GET', 'https://example.com/main', 200, b'{}')
+    config = SimpleNamespace(stash={api_client_key: client, shared_cache_stats_key: [0, 0]})
+    for number in range(2):
+        worker = Cassette()
+        worker.add('GET', f'https://example.com/worker{number}', 200, b'[]')
+        pytest_testnodedown(SimpleNamespace(config=config, workeroutput={'cassette': worker.exchanges}), None)
+    assert len(client.recorder) == 3
+    assert client.recorder.lookup('GET https://example.com/worker1') == (200, {}, b'[]')
+    client.close()
+
+
+# процесс, запрашивающий url через общий кэш: выводит попадания и промахи
+SHARED_CACHE_PROCESS = '''
+import json, sys
+from harness.http_client import ApiClient
+from harness.shared_cache import SharedResponseCache
+client = ApiClient(cache_scope='session')
+client.shared_cache = SharedResponseCache(sys.argv[1], run_id='run')
+client.request('GET', sys.argv[2])
+print(json.dumps([client.shared_cache.hits, client.shared_cache.misses]))
+client.close()
+'''
+
+
+def _shared_client(path, **kwargs) -> ApiClient:
+    """Функция создания клиента с общим кэшем без мемоизации в памяти процесса"""
+    client = ApiClient()
+    client.shared_cache = SharedResponseCache(path, run_id='run', **kwargs)
+    client.cache_scope = 'session'
+    return client
+
+
+def test_shared_cache_one_request_for_two_processes(local_server, tmp_path):
+    """Проверка, что одновременный GET из двух процессов доходит до сервера один раз"""
+    local_server.delay = 0.3
+    processes = [subprocess.Popen([sys.executable, '-c', SHARED_CACHE_PROCESS, str(tmp_path / 'shared.sqlite'),
+                                   f'{local_server.base_url}/shared'], stdout=subprocess.PIPE, text=True,
+                                  cwd=Path(__file__).parent)
+                 for _ in range(2)]
+    stats = [json.loads(process.communicate(timeout=30)[0]) for process in processes]
+    assert local_server.received == [('GET', '/shared')]
+    assert sorted(stats) == [[0, 1], [1, 0]]
+
+
+def test_shared_cache_ttl(local_server, tmp_path):
+    """Проверка повторной отправки запроса, сохраненного в общем кэше раньше ttl секунд назад"""
+    client = _shared_client(tmp_path / 'shared.sqlite', ttl=0.2)
+    for pause in (0, 0, 0.3):
+        time.sleep(pause)
+        client.clear_cache('session')
+        client.request('GET', f'{local_server.base_url}/ttl')
+    # второй запрос отдан из общего кэша, третий - после истечения ttl
+    assert len(local_server.received) == 2
+    assert (client.shared_cache.hits, client.shared_cache.misses) == (1, 2)
+    client.close()
+
+
+def test_shared_cache_maxsize(local_server, tmp_path):
+    """Проверка, что в общем кэше остается не больше maxsize самых свежих записей"""
+    client = _shared_client(tmp_path / 'shared.sqlite', maxsize=3)
+    for number in range(5):
+        client.request('GET', f'{local_server.base_url}/page/{number}')
+        assert len(client.shared_cache) <= 3
+    client.clear_cache('session')
+    client.request('GET', f'{local_server.base_url}/page/4')
+    client.request('GET', f'{local_server.base_url}/page/0')
+    assert [path for _, path in local_server.received][-1] == '/page/0', 'Вытеснена не самая старая запись'
+    assert len(local_server.received) == 6
+    client.close()
+
+
+def test_shared_cache_stats_from_workers(tmp_path):
+    """Проверка передачи попаданий и промахов общего кэша из воркеров xdist и их суммирования"""
+    controller = SimpleNamespace(stash={api_client_key: ApiClient(), shared_cache_stats_key: [0, 0]})
+    for hits, misses in ((3, 1), (2, 4)):
+        client = _shared_client(tmp_path / 'shared.sqlite')
+        client.shared_cache.hits, client.shared_cache.misses = hits, misses
+        workeroutput = {}
+        pytest_sessionfinish(SimpleNamespace(config=SimpleNamespace(stash={api_client_key: client},
+                                                                    workeroutput=workeroutput)))
+        pytest_testnodedown(SimpleNamespace(config=controller, workeroutput=workeroutput), None)
+        client.close()
+    assert controller.stash[shared_cache_stats_key] == [5, 5]
+
+
+def test_rate_limit_halves_once_per_interval(local_server):
+    """Проверка снижения частоты вдвое на серию 429 (не чаще раза в интервал) и повторов до успешного ответа"""
+    client = ApiClient(retries=3, backoff=0.01, rate_limit=20)
+    local_server.script = [(429, {})] * 3
+    response = client.request('GET', local_server.url)
+    assert response.status_code == 200, f'Возвращается код, отличный от 200: {response.status_code}'
+
+    requests_sent, retries, throttled_responses, _, rate = client.throttle_stats()[
+        f'127.0.0.1:{local_server.server_address[1]}']
+    assert (requests_sent, retries, throttled_responses) == (4, 3, 3)
+    # три 429 подряд укладываются в DECREASE_INTERVAL - одно снижение, затем прирост после 200
+    assert rate == 20 * RATE_DECREASE + RATE_INCREASE
+    client.close()
+
+
+def test_rate_limit_recovers_additively(local_server):
+    """Проверка постепенного возврата частоты после 429 с шагом RATE_INCREASE на каждый успешный ответ"""
+    client = ApiClient(retries=0, rate_limit=20)
+    local_server.script = [(429, {})]
+    assert client.request('GET', local_server.url).status_code == 429
+    assert client.rate_limiter.current_rate(local_server.url) == 20 * RATE_DECREASE
+    for step in range(1, 4):
+        assert client.request('GET', local_server.url).status_code == 200
+        assert client.rate_limiter.current_rate(local_server.url) == 20 * RATE_DECREASE + step * RATE_INCREASE
+    client.close()
+
+
+def test_token_bucket_limits():
+    """Проверка потолка восстановления частоты и повторного снижения только после DECREASE_INTERVAL"""
+    bucket = TokenBucket(rate=2)
+    bucket.slow_down(None)
+    bucket.slow_down(None)
+    assert bucket.rate == 2 * RATE_DECREASE
+    for _ in range(10):
+        bucket.speed_up()
+    assert bucket.rate == 2
+    bucket.decreased -= DECREASE_INTERVAL
+    bucket.slow_down(None)
+    assert bucket.rate == 2 * RATE_DECREASE
+
+
+def test_retry_after_pause(local_server):
+    """Проверка паузы перед повтором до истечения Retry-After"""
+    # высокий лимит: снижение частоты после 429 почти не задерживает повтор, ждать заставляет Retry-After
+    client = ApiClient(retries=1, backoff=0.001, rate_limit=100)
+    local_server.script = [(429, {'Retry-After': '0.3'})]
+    assert client.request('GET', local_server.url).status_code == 200
+    first, second = local_server.arrivals
+    assert 0.28 <= second - first < 1, f'Повтор отправлен не по Retry-After: через {second - first:.3f} сек'
+    client.close()
+
+
+def test_exhausted_quota_pause(local_server):
+    """Проверка паузы до обновления исчерпанной квоты (X-RateLimit-Remaining: 0) и ее отсутствия,
+    пока квота не исчерпана"""
+    client = ApiClient()
+    local_server.script = [(200, {'X-RateLimit-Remaining': '5', 'X-RateLimit-Reset': '30'}),
+                                (200, {'X-RateLimit-Remaining': '0', 'X-RateLimit-Reset': '0.3'})]
+    for _ in range(3):
+        client.request('GET', local_server.url)
+    first, second, third = local_server.arrivals
+    assert second - first < 0.2, f'Пауза при неисчерпанной квоте: {second - first:.3f} сек'
+    assert third - second >= 0.28, f'Запрос отправлен до обновления квоты: через {third - second:.3f} сек'
+    client.close()
+
+
+@pytest.mark.parametrize('path, message',
+                         [('/posts/{post', 'некорректный шаблон'),
+                          ('/posts/{user_id}', 'в шаблоне используется неизвестный параметр')],
+                         ids=['unclosed brace', 'unknown param'])
+def test_compile_spec_template_errors(path, message):
+    """Проверка ошибки разбора шаблона с указанием файла и эндпоинта"""
+    spec = {'endpoints': [{'name': 'post_by_id', 'path': path, 'params': {'post': [1]}}]}
+    with pytest.raises(SpecError, match=f'spec_posts.yaml: post_by_id: {message}'):
+        compile_spec(spec, source='spec_posts.yaml')
+
+
+def test_node_id_reset_after_teardown():
+    """Проверка отвязки запросов от теста после его teardown: запросы между тестами не приписываются
+    последнему тесту"""
+    client = ApiClient()
+    client.node_id = 'test_harness.py::test_previous'
+    item = SimpleNamespace(nodeid=client.node_id, stash={}, config=SimpleNamespace(stash={api_client_key: client}))
+    teardown = pytest_runtest_teardown(item)
+    next(teardown)
+    with pytest.raises(StopIteration):
+        teardown.send(None)
+    assert client.node_id is None
+    client.close()
+
+
+@pytest.mark.parametrize('option, enabled',
+                         [(None, True),
+                          ('--load', False),
+                          ('--no-conditional-requests', False),
+                          ('--replay', False)],
+                         ids=['default', 'load', 'disabled', 'replay'])
+def test_conditional_store_modes(tmp_path, option, enabled):
+    """Проверка, что условные запросы отключаются под нагрузкой, при воспроизведении кассет и по параметру"""
+    options = {'--no-conditional-requests': False, '--load': False, '--record': None, '--replay': None,
+               '--conditional-store-size': 16}
+    if option is not None:
+        options[option] = True
+    config = SimpleNamespace(cache=SimpleNamespace(mkdir=lambda name: tmp_path), getoption=options.get)
+    store = _conditional_store(config)
+    assert (store is not None) == enabled
+    if store is not None:
+        store.close()
+
+
+def test_load_runner_one_request_per_call(local_server):
+    """Проверка нагрузки на локальный сервер: каждый вызов сценария - ровно один запрос
+    (без повторов и ожидания клиента на 503), ошибки и перцентили считаются по ответам сервера"""
+    local_server.default = (503, {'Retry-After': '1'})
+    client = ApiClient()
+    prepare_client(client)
+    runner = LoadRunner([Scenario('busy', client.request, 'GET', f'{local_server.base_url}/busy'),
+                         Scenario('busy expected', client.request, 'GET', f'{local_server.base_url}/busy',
+                                  expected_status=503)],
+                        concurrency=2, duration=0.3, seed=1)
+    stats = runner.run()
+    assert sum(endpoint.requests for endpoint in stats.values()) == len(local_server.received)
+    assert stats['busy'].requests > 10 and stats['busy'].error_rate == 1.0
+    assert stats['busy expected'].requests > 10 and stats['busy expected'].errors == 0
+    assert stats['busy'].percentile(99) < 0.1, f'p99 включает ожидание клиента: {stats["busy"].percentile(99):.3f} сек'
+    assert len(runner.report()) == 3
+    assert client.timings.timings == [] and not client.timings.by_node, 'Под нагрузкой сохраняются замеры запросов'
+    client.close()
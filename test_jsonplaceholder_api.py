@@ -1,9 +1,10 @@
 """Модуль проверок JSON Placeholder API"""
-import json
 from typing import Optional
-import requests
 import pytest
 from pydantic import BaseModel
+from harness import http_client
+from harness.load import Scenario
+from harness.schema import validate_list
 
 
 
@@ -18,43 +19,49 @@ class Post(BaseModel):
 def get_posts(post_id=None):
     """Функция для get-запроса постов (всех или заданного кол-ва)"""
     if post_id is None:
-        response = requests.get('https://jsonplaceholder.typicode.com/posts',
-                                timeout=100)
+        response = http_client.get('https://jsonplaceholder.typicode.com/posts',
+                                   timeout=100)
         return response
-    response = requests.get(f'https://jsonplaceholder.typicode.com/posts/{post_id}',
-                            timeout=100)
+    response = http_client.get(f'https://jsonplaceholder.typicode.com/posts/{post_id}',
+                               timeout=100)
     return response
 
 
 def create_post(body: str):
     """Функция для post-запроса создания поста"""
     headers = {'Content-type': 'application/json; charset=UTF-8'}
-    response = requests.post(data=body,
-                             headers=headers,
-                             url='https://jsonplaceholder.typicode.com/posts',
-                             timeout=100)
+    response = http_client.post(data=body,
+                                headers=headers,
+                                url='https://jsonplaceholder.typicode.com/posts',
+                                timeout=100)
     return response
 
 
 def update_post(body: str, post_id: int):
     """Функция для put-запроса изменения всего поста"""
     headers = {'Content-type': 'application/json; charset=UTF-8'}
-    response = requests.put(data=body,
-                            headers=headers,
-                            url=f'https://jsonplaceholder.typicode.com/posts/{post_id}',
-                            timeout=100)
+    response = http_client.put(data=body,
+                               headers=headers,
+                               url=f'https://jsonplaceholder.typicode.com/posts/{post_id}',
+                               timeout=100)
     return response
 
 
+LOAD_SCENARIOS = [
+    Scenario('jsonplaceholder: все посты', get_posts),
+    Scenario('jsonplaceholder: один пост', get_posts, 1, weight=3),
+]
+
+
 def test_get_all_posts():
-    """Позитивная проверка эндпоинта получения всех постов + модели записи поста"""
+    """Позитивная проверка эндпоинта получения всех постов + модели всех записей постов"""
     response = get_posts()
     assert response.status_code == 200, f'Возвращается код, отличный от 200: {response.status_code}'
 
-    one_post_json = json.dumps(response.json()[0])
-    Post.model_validate_json(one_post_json)
+    validate_list(response, Post)
 
 
+@pytest.mark.api_concurrent(prefetch=get_posts)
 @pytest.mark.parametrize('post_id',
                          [1, 20, 100],
                          ids=['id=1', 'id=20', 'id=100'])
@@ -69,6 +76,7 @@ def test_get_one_post_posit(post_id):
     assert post.id == post_id, f'id ожидаемый: {post_id}, а полученный: {post.id}'
 
 
+@pytest.mark.api_concurrent(prefetch=get_posts)
 @pytest.mark.parametrize('post_id',
                          [101, 200],
                          ids=['101-not exist id', '200-not exist id'])